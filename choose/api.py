@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -13,9 +12,9 @@ from django.conf import settings
 from extract.utils import render_pattern
 from kwc.utils.files import safe_remove, safe_rename
 
-from .constants import SEASON_EPISODE_PATTERN
 from .models import FolderProgress, ImageDecision
 from .utils import (
+    SEASON_EPISODE_RE,
     add_version_suffix,
     get_folder_path,
     list_image_files,
@@ -52,9 +51,6 @@ class APIError(Exception):
         super().__init__(message)
 
 
-SEASON_EPISODE_RE = re.compile(SEASON_EPISODE_PATTERN, re.IGNORECASE)
-
-
 def parse_decision_request(body: bytes) -> DecisionPayload:
     """Decode and sanitise a decision payload from raw request bytes."""
 
@@ -106,23 +102,27 @@ def apply_decisions(folder: str, payload: DecisionPayload) -> ApplyResult:
         logger.warning("Permission denied scanning folder %s: %s", safe_name, exc)
         raise APIError("permission_denied", 403, str(exc)) from exc
 
-    decisions = list(ImageDecision.objects.filter(folder=safe_name).order_by("decided_at", "filename"))
-    decision_map = {d.filename: d.decision for d in decisions}
+    decisions = list(
+        ImageDecision.objects.filter(folder=safe_name)
+        .order_by("decided_at", "filename")
+        .values_list("filename", "decision")
+    )
+    decision_map = dict(decisions)
 
     indices_by_name = {name: idx for idx, name in enumerate(files)}
     previous_progress = FolderProgress.objects.filter(folder=safe_name).first()
     prev_keep_count = previous_progress.keep_count if previous_progress else 0
 
     to_delete = [name for name in files if decision_map.get(name) == ImageDecision.DECISION_DELETE]
-    remaining_names = [name for name in files if name not in to_delete]
+    delete_names = set(to_delete)
+    remaining_names = [name for name in files if name not in delete_names]
 
     ordered_decided_keeps: list[str] = []
     seen_keeps: set[str] = set()
-    for decision in decisions:
-        if decision.decision != ImageDecision.DECISION_KEEP:
+    for name, decision in decisions:
+        if decision != ImageDecision.DECISION_KEEP:
             continue
-        name = decision.filename
-        if name in seen_keeps or name not in indices_by_name or name in to_delete:
+        if name in seen_keeps or name not in indices_by_name or name in delete_names:
             continue
         ordered_decided_keeps.append(name)
         seen_keeps.add(name)
@@ -379,7 +379,7 @@ def apply_decisions(folder: str, payload: DecisionPayload) -> ApplyResult:
 
     _cleanup_temporary_files(tmp_map)
 
-    remaining_prev_keep_count = sum(1 for name in files[:prev_keep_count] if name not in to_delete)
+    remaining_prev_keep_count = sum(1 for name in files[:prev_keep_count] if name not in delete_names)
     keep_names_beyond_prev = {
         name
         for name, decision in decision_map.items()
@@ -394,9 +394,7 @@ def apply_decisions(folder: str, payload: DecisionPayload) -> ApplyResult:
         anchor_name = final_keep_names[anchor_index]
 
     last_original_name = (
-        decisions[-1].filename
-        if decisions
-        else (previous_progress.last_classified_original if previous_progress else "")
+        decisions[-1][0] if decisions else (previous_progress.last_classified_original if previous_progress else "")
     )
 
     FolderProgress.objects.update_or_create(
@@ -3,6 +3,9 @@
 # Supported image file extensions (lowercase)
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 
+# Explicit folder cover filenames, in lookup priority order
+COVER_FILENAMES = (".cover.jpg", ".cover.jpeg", ".cover.png", ".cover.webp")
+
 # Season/episode pattern for parsing filenames
 # Supports: S01E02 (season+episode), S01 (season only), E02 (episode only)
 # Uses word boundaries to avoid false matches like "frame01"
@@ -12,4 +15,12 @@ SEASON_EPISODE_PATTERN = (
 
 # Thumbnail configuration
 THUMB_MAX_DIMENSION = 4096
-THUMB_CACHE_SIZE = 256
+# Upper bound on rendered thumbnail bytes kept in memory per process
+THUMB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Thumbnail widths the pages link to; only these renditions are written to the persistent cache, so arbitrary
+# ?w=/&h= values cannot grow it
+THUMB_PERSISTED_WIDTHS = frozenset({320, 360, 420, 512})
+# Minimum seconds between two size checks of the persistent cache, per process
+THUMB_PRUNE_INTERVAL = 300.0
+# Temp files younger than this may still be renamed into place by another worker, so pruning leaves them alone
+THUMB_TMP_GRACE = 60.0
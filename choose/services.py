@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
 import shutil
 from collections import defaultdict
 from dataclasses import asdict, dataclass
@@ -17,15 +16,19 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from extract.utils import render_pattern
+from kwc.utils.files import invalidate_path
 
+from .constants import COVER_FILENAMES
 from .models import FolderProgress, ImageDecision
 from .utils import (
+    COUNTER_RE,
     add_version_suffix,
     discard_root,
     extraction_root,
     find_cover_filename,
     get_folder_path,
     list_image_files,
+    list_image_stats,
     parse_folder_name,
     parse_season_episode,
     parse_title_year_from_folder,
@@ -136,15 +139,55 @@ def format_section_title(season: str, episode: str) -> str:
     return " ".join(parts) if parts else "General"
 
 
+# Sort order: General, Season X (or episode-only), Season X Intro, Season X Episodes, Season X Outro
+def _section_sort_key(item: tuple[tuple[str, str], list[GalleryImage]]) -> tuple[int, int, int, str]:
+    season, episode = item[0]
+    # Empty season/episode comes first (General section)
+    if not season and not episode:
+        return (0, 0, 0, "")
+
+    # Parse season as int if possible
+    # For episode-only patterns (no season), treat as season 1
+    try:
+        season_int = int(season) if season else 1
+    except ValueError:
+        season_int = 999999
+
+    # Handle empty episode (season-only) - comes right after General
+    if not episode:
+        return (season_int, 1, 0, "")
+
+    # Handle special episodes (IN, OU)
+    episode_upper = episode.upper()
+    if episode_upper == "IN":
+        # Intro comes after season-only
+        return (season_int, 2, 0, "")
+    elif episode_upper == "OU":
+        # Outro comes at the end after all episodes
+        return (season_int, 999998, 0, "")
+
+    # Parse episode as int if possible, otherwise use string sorting
+    try:
+        episode_int = int(episode)
+        episode_str = ""
+        # Regular episodes come after intro but before outro
+        return (season_int, 3, episode_int, episode_str)
+    except ValueError:
+        episode_int = 999999
+        episode_str = episode_upper
+        return (season_int, 4, episode_int, episode_str)
+
+
 def list_gallery_images(folder: str, root: Path | None = None) -> GalleryContext:
     safe_name = validate_folder_name(folder)
     root_path = root or wallpapers_root()
     target = get_folder_path(safe_name, root_path)
 
     try:
-        files = list_image_files(target)
+        stats = list_image_stats(target)
     except PermissionError:
-        files: list[str] = []  # type: ignore[no-redef]
+        stats = {}
+    files = list(stats)
 
     title, year_int = parse_folder_name(safe_name)
     year_display = str(year_int) if year_int is not None else ""
@@ -153,17 +196,23 @@ def list_gallery_images(folder: str, root: Path | None = None) -> GalleryContext
     cover_url = wallpaper_url(safe_name, cover_filename, root=root_path) if cover_filename else None
     cover_thumb_url = thumbnail_url(safe_name, cover_filename, width=420, root=root_path) if cover_filename else None
 
-    # First, group files by their base name (without version suffix) to identify version sets
+    # First, group files by their base name (without version suffix) to identify version sets.
+    # Each filename is parsed exactly once here; grouping, ordering and version info reuse the results.
+    version_suffixes: dict[str, str] = {}
+    group_keys: dict[str, str] = {}
     version_groups: dict[str, list[str]] = defaultdict(list)
     for name in files:
         valid_suffix, invalid_suffix = parse_version_suffix(name)
-        if valid_suffix or not invalid_suffix:
-            # Valid suffix or no suffix - group by base name
-            base_name = strip_version_suffix(name)
-            version_groups[base_name].append(name)
-        else:
-            # Invalid suffix - treat as separate image
-            version_groups[name].append(name)
+        version_suffixes[name] = valid_suffix
+        # Valid suffix or no suffix - group by base name; invalid suffix - treat as separate image
+        group_key = strip_version_suffix(name) if (valid_suffix or not invalid_suffix) else name
+        group_keys[name] = group_key
+        version_groups[group_key].append(name)
+
+    def version_sort_key(filename: str) -> tuple[int, str]:
+        suffix = version_suffixes[filename]
+        # Base image (no suffix) sorts first (0), others by suffix (1)
+        return (0 if not suffix else 1, suffix)
 
     # Build gallery images with version information
     # For each version group, the base image (no suffix) should be the "primary" one
@@ -176,45 +225,34 @@ def list_gallery_images(folder: str, root: Path | None = None) -> GalleryContext
         if name in processed_files:
             continue
 
-        valid_suffix, invalid_suffix = parse_version_suffix(name)
-        if valid_suffix or not invalid_suffix:
-            # Valid suffix or no suffix - find its version group
-            base_name = strip_version_suffix(name)
-            version_files = version_groups[base_name]
-        else:
-            # Invalid suffix - treat as separate image
-            version_files = version_groups[name]
+        base_name = group_keys[name]
+        version_files = version_groups[base_name]
 
         # Sort so base image (no suffix) comes first, then alphabetically by suffix
-        def sort_key(filename: str) -> tuple[int, str]:
-            suffix, _ = parse_version_suffix(filename)
-            # Base image (no suffix) sorts first (0), others by suffix (1)
-            return (0 if not suffix else 1, suffix)
-
-        sorted_versions = sorted(version_files, key=sort_key)
+        sorted_versions = sorted(version_files, key=version_sort_key)
         primary_name = sorted_versions[0]
 
         # Build version info for all files in this group
         versions = []
         for vname in sorted_versions:
-            vsuffix, _ = parse_version_suffix(vname)
             versions.append(
                 {
                     "name": vname,
-                    "url": wallpaper_url(safe_name, vname, root=root_path),
-                    "thumb_url": thumbnail_url(safe_name, vname, width=512, root=root_path),
-                    "version_suffix": vsuffix,
+                    "url": wallpaper_url(safe_name, vname, root=root_path, stat=stats[vname]),
+                    "thumb_url": thumbnail_url(safe_name, vname, width=512, root=root_path, stat=stats[vname]),
+                    "version_suffix": version_suffixes[vname],
                 }
             )
 
-        # Create the primary gallery image (represents the whole version stack)
-        primary_suffix, _ = parse_version_suffix(primary_name)
+        # Create the primary gallery image (represents the whole version stack); it is versions[0], so its
+        # URLs are shared with that entry instead of being built a second time
+        primary = versions[0]
         image: GalleryImage = {
             "name": primary_name,
-            "url": wallpaper_url(safe_name, primary_name, root=root_path),
-            "thumb_url": thumbnail_url(safe_name, primary_name, width=512, root=root_path),
-            "version_suffix": primary_suffix,
-            "base_name": strip_version_suffix(name) if (valid_suffix or not invalid_suffix) else name,
+            "url": primary["url"],
+            "thumb_url": primary["thumb_url"],
+            "version_suffix": primary["version_suffix"],
+            "base_name": base_name,
             "versions": versions,  # type: ignore[typeddict-item]
             "versions_json": mark_safe(json.dumps(versions)),  # JSON-encoded for template
         }
@@ -234,45 +272,7 @@ def list_gallery_images(folder: str, root: Path | None = None) -> GalleryContext
         grouped[key].append(image)
 
     # Convert grouped dict to sorted list of sections
-    # Sort order: General, Season X (or episode-only), Season X Intro, Season X Episodes, Season X Outro
-    def sort_key(item: tuple[tuple[str, str], list[GalleryImage]]) -> tuple:  # type: ignore[no-redef]
-        season, episode = item[0]
-        # Empty season/episode comes first (General section)
-        if not season and not episode:
-            return (0, 0, 0, "")
-
-        # Parse season as int if possible
-        # For episode-only patterns (no season), treat as season 1
-        try:
-            season_int = int(season) if season else 1
-        except ValueError:
-            season_int = 999999
-
-        # Handle empty episode (season-only) - comes right after General
-        if not episode:
-            return (season_int, 1, 0, "")
-
-        # Handle special episodes (IN, OU)
-        episode_upper = episode.upper()
-        if episode_upper == "IN":
-            # Intro comes after season-only
-            return (season_int, 2, 0, "")
-        elif episode_upper == "OU":
-            # Outro comes at the end after all episodes
-            return (season_int, 999998, 0, "")
-
-        # Parse episode as int if possible, otherwise use string sorting
-        try:
-            episode_int = int(episode)
-            episode_str = ""
-            # Regular episodes come after intro but before outro
-            return (season_int, 3, episode_int, episode_str)
-        except ValueError:
-            episode_int = 999999
-            episode_str = episode_upper
-            return (season_int, 4, episode_int, episode_str)
-
-    sorted_groups = sorted(grouped.items(), key=sort_key)  # type: ignore[arg-type]
+    sorted_groups = sorted(grouped.items(), key=_section_sort_key)
 
     sections: list[GallerySection] = []
     for (season, episode), group_images in sorted_groups:
@@ -333,9 +333,10 @@ def load_folder_context(
     target = get_folder_path(safe_name, root_path)
 
     try:
-        files = list_image_files(target)
+        stats = list_image_stats(target)
     except PermissionError:
-        files = []
+        stats = {}
+    files = list(stats)
 
     # Filter files by season/episode if specified
     # Note: Empty strings mean we want to filter for the General section (no season/episode)
@@ -351,14 +352,13 @@ def load_folder_context(
         files = filtered_files
 
     decisions_qs = ImageDecision.objects.filter(folder=safe_name)
-    decisions = list(decisions_qs.order_by("decided_at", "filename"))
-    decision_map = {decision.filename: decision.decision for decision in decisions}
+    decision_map = dict(decisions_qs.values_list("filename", "decision"))
 
     images: list[FolderImage] = [
         {
             "name": name,
-            "url": wallpaper_url(safe_name, name, root=root_path),
-            "thumb_url": thumbnail_url(safe_name, name, width=320, root=root_path),
+            "url": wallpaper_url(safe_name, name, root=root_path, stat=stats[name]),
+            "thumb_url": thumbnail_url(safe_name, name, width=320, root=root_path, stat=stats[name]),
             "decision": decision_map.get(name, ""),
         }
         for name in files
@@ -422,7 +422,7 @@ def _get_max_counters(folder_path: Path) -> dict[tuple[str, str], int]:
         season, episode = parse_season_episode(stem)
 
         # Parse Counter
-        counter_match = re.search(r"(\d+)$", stem)
+        counter_match = COUNTER_RE.search(stem)
         if counter_match:
             try:
                 val = int(counter_match.group(1))
@@ -452,9 +452,9 @@ def ingest_inbox_folder(folder_name: str) -> dict[str, Any]:
     lib_path.mkdir(parents=True, exist_ok=True)
 
     # Check for cover image in inbox and copy if missing in library
-    for cand in (".cover.jpg", ".cover.jpeg", ".cover.png", ".cover.webp"):
+    for cand in COVER_FILENAMES:
         src_cover = source_path / cand
-        if src_cover.exists() and src_cover.is_file():
+        if src_cover.is_file():
             dest_cover = lib_path / cand
             if not dest_cover.exists():
                 try:
@@ -482,114 +482,130 @@ def ingest_inbox_folder(folder_name: str) -> dict[str, Any]:
     # Load existing library counters to append correctly
     current_counters = _get_max_counters(lib_path)
 
+    # List each directory once and track names in memory instead of probing the disk per file
+    inbox_names = set(os.listdir(source_path))
+    library_names = set(os.listdir(lib_path))
+    trash_names = set(os.listdir(trash_path))
+
     moved_keeps = 0
     moved_trash = 0
     errors: list[str] = []
+    # Decisions of moved files are dropped in one query once every file has been handled
+    moved_filenames: list[str] = []
 
-    # Process files
-    # We iterate valid decisions first for order, then check file existence
-
-    # Sort keeps by decision time to respect user order
-    sorted_keeps = decisions_qs.filter(decision=ImageDecision.DECISION_KEEP).order_by("decided_at", "filename")
-    keep_filenames = [d.filename for d in sorted_keeps]
-
-    # Process Keeps
-    # We must group by base name to ensure versions get same counter?
-    # Current policy: Treat versions as separate files with suffixes.
-    # But they should share the counter if they are versions of same image.
-    # Map base_name -> assigned_counter to reuse it for versions.
-    assigned_counters: dict[str, int] = {}  # base_name_in_inbox -> assigned_counter
-
-    for filename in keep_filenames:
-        src = source_path / filename
-        if not src.exists():
-            continue
-
-        # Parse info
-        suffix, _ = parse_version_suffix(filename)
-        base_name_inbox = strip_version_suffix(filename)
-        stem = os.path.splitext(base_name_inbox)[0]
-        original_ext = os.path.splitext(base_name_inbox)[1]
-
-        season, episode = parse_season_episode(stem)
-        key = (season, episode)
+    try:
+        # Process files
+        # We iterate valid decisions first for order, then check file existence
+
+        # Sort keeps by decision time to respect user order
+        keep_filenames = list(
+            decisions_qs.filter(decision=ImageDecision.DECISION_KEEP)
+            .order_by("decided_at", "filename")
+            .values_list("filename", flat=True)
+        )
 
-        # Determine counter
-        if base_name_inbox in assigned_counters:
-            count = assigned_counters[base_name_inbox]
-        else:
-            current_counters[key] += 1
-            count = current_counters[key]
-            assigned_counters[base_name_inbox] = count
-
-        # render new name
-        values: dict[str, object] = {
-            "title": base_title,
-            "base_title": base_title,
-            "year": parsed_year or "",
-            "season": int(season) if season and season.isdigit() else season,
-            "episode": int(episode) if episode and episode.isdigit() else episode,
-            "counter": count,
-        }
-        new_base_name = render_pattern(pattern, values)
+        # Process Keeps
+        # We must group by base name to ensure versions get same counter?
+        # Current policy: Treat versions as separate files with suffixes.
+        # But they should share the counter if they are versions of same image.
+        # Map base_name -> assigned_counter to reuse it for versions.
+        assigned_counters: dict[str, int] = {}  # base_name_in_inbox -> assigned_counter
 
-        # Preserve original file extension by replacing pattern's extension
-        pattern_stem = os.path.splitext(new_base_name)[0]
-        new_base_name = pattern_stem + original_ext
+        for filename in keep_filenames:
+            if filename not in inbox_names:
+                continue
+            src = source_path / filename
 
-        new_name = add_version_suffix(new_base_name, suffix)
+            # Parse info
+            suffix, _ = parse_version_suffix(filename)
+            base_name_inbox = strip_version_suffix(filename)
+            stem = os.path.splitext(base_name_inbox)[0]
+            original_ext = os.path.splitext(base_name_inbox)[1]
 
-        dest = lib_path / new_name
+            season, episode = parse_season_episode(stem)
+            key = (season, episode)
 
-        # Prevent overwriting existing library files
-        if dest.exists():
-            # This shouldn't happen with monotonic counters, but race conditions/manual changes exists
-            # Fallback: keep incrementing until free
-            while dest.exists():
+            # Determine counter
+            if base_name_inbox in assigned_counters:
+                count = assigned_counters[base_name_inbox]
+            else:
                 current_counters[key] += 1
                 count = current_counters[key]
-                values["counter"] = count
-                new_base_name = render_pattern(pattern, values)
-                # Preserve original file extension
-                pattern_stem = os.path.splitext(new_base_name)[0]
-                new_base_name = pattern_stem + original_ext
-                new_name = add_version_suffix(new_base_name, suffix)
-                dest = lib_path / new_name
-            # Update assigned map for subsequent versions
-            assigned_counters[base_name_inbox] = count
-
-        try:
-            shutil.move(str(src), str(dest))
-            moved_keeps += 1
-            # Remove decision
-            ImageDecision.objects.filter(folder=safe_name, filename=filename).delete()
-        except OSError as exc:
-            errors.append(f"Failed to move {filename} to library: {exc}")
-
-    # Process Deletes (Trash)
-    trash_decisions = decisions_qs.filter(decision=ImageDecision.DECISION_DELETE)
-    for d in trash_decisions:
-        filename = d.filename
-        src = source_path / filename
-        if not src.exists():
-            continue
-
-        dest = trash_path / filename
-
-        # Handle existing files with the same name in trash folder
-        if dest.exists():
-            # Append timestamp to prevent collision
-            stem = dest.stem
-            suffix = dest.suffix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            dest = trash_path / f"{stem}_{timestamp}{suffix}"
+                assigned_counters[base_name_inbox] = count
+
+            # render new name
+            values: dict[str, object] = {
+                "title": base_title,
+                "base_title": base_title,
+                "year": parsed_year or "",
+                "season": int(season) if season and season.isdigit() else season,
+                "episode": int(episode) if episode and episode.isdigit() else episode,
+                "counter": count,
+            }
+            new_base_name = render_pattern(pattern, values)
+
+            # Preserve original file extension by replacing pattern's extension
+            pattern_stem = os.path.splitext(new_base_name)[0]
+            new_base_name = pattern_stem + original_ext
+
+            new_name = add_version_suffix(new_base_name, suffix)
+
+            # Prevent overwriting existing library files
+            if new_name in library_names:
+                # This shouldn't happen with monotonic counters, but race conditions/manual changes exists
+                # Fallback: keep incrementing until free
+                while new_name in library_names:
+                    current_counters[key] += 1
+                    count = current_counters[key]
+                    values["counter"] = count
+                    new_base_name = render_pattern(pattern, values)
+                    # Preserve original file extension
+                    pattern_stem = os.path.splitext(new_base_name)[0]
+                    new_base_name = pattern_stem + original_ext
+                    new_name = add_version_suffix(new_base_name, suffix)
+                # Update assigned map for subsequent versions
+                assigned_counters[base_name_inbox] = count
+
+            dest = lib_path / new_name
+            try:
+                shutil.move(str(src), str(dest))
+                moved_filenames.append(filename)
+                library_names.add(new_name)
+                moved_keeps += 1
+                invalidate_path(src)
+                invalidate_path(dest)
+            except OSError as exc:
+                errors.append(f"Failed to move {filename} to library: {exc}")
+
+        # Process Deletes (Trash)
+        trash_filenames = decisions_qs.filter(decision=ImageDecision.DECISION_DELETE).values_list("filename", flat=True)
+        for filename in trash_filenames:
+            if filename not in inbox_names:
+                continue
+            src = source_path / filename
+
+            dest = trash_path / filename
+
+            # Handle existing files with the same name in trash folder
+            if dest.name in trash_names:
+                # Append timestamp to prevent collision
+                stem = dest.stem
+                suffix = dest.suffix
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                dest = trash_path / f"{stem}_{timestamp}{suffix}"
 
-        try:
-            shutil.move(str(src), str(dest))
-            moved_trash += 1
-            ImageDecision.objects.filter(folder=safe_name, filename=filename).delete()
-        except OSError as exc:
-            errors.append(f"Failed to move {filename} to trash: {exc}")
+            try:
+                shutil.move(str(src), str(dest))
+                moved_filenames.append(filename)
+                trash_names.add(dest.name)
+                moved_trash += 1
+                invalidate_path(src)
+            except OSError as exc:
+                errors.append(f"Failed to move {filename} to trash: {exc}")
+    finally:
+        # Runs even if a later file raises, so files that already moved never keep a stale decision
+        if moved_filenames:
+            decisions_qs.filter(filename__in=moved_filenames).delete()
 
     # Cleanup
     remaining_files = list_image_files(source_path)
@@ -598,6 +614,8 @@ def ingest_inbox_folder(folder_name: str) -> dict[str, Any]:
         try:
             shutil.rmtree(source_path)
             shutil.rmtree(trash_path, ignore_errors=True)  # Optional: clean empty trash folder? No, keep history.
+            for cand in COVER_FILENAMES:
+                invalidate_path(source_path / cand)
         except OSError as exc:
             errors.append(f"Failed to remove empty inbox folder: {exc}")
 
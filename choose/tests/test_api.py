@@ -53,6 +53,21 @@ def test_decide_api_invalid_decision(client) -> None:
     assert response.json() == {"error": "invalid_decision"}
 
 
+def test_decide_api_overwrites_existing_decision(client) -> None:
+    url = reverse("choose:decide", kwargs={"folder": "Movie"})
+    for decision in (ImageDecision.DECISION_KEEP, ImageDecision.DECISION_DELETE):
+        response = client.post(
+            url,
+            data=json.dumps({"filename": "frame01.jpg", "decision": decision}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json()["decision"] == decision
+
+    stored = ImageDecision.objects.get(folder="Movie", filename="frame01.jpg")
+    assert stored.decision == ImageDecision.DECISION_DELETE
+
+
 def test_save_api_permission_error(client, wallpapers_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     folder = wallpapers_dir / "Clip"
     folder.mkdir()
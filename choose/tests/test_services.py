@@ -7,6 +7,7 @@ import pytest
 from choose.models import FolderProgress, ImageDecision
 from choose.services import ingest_inbox_folder, list_gallery_images, load_folder_context
 from choose.utils import wallpapers_root
+from kwc.utils.files import file_changed
 
 pytestmark = pytest.mark.django_db(transaction=True)
 
@@ -304,3 +305,81 @@ def test_ingest_does_not_overwrite_existing_cover(ingest_dirs: Path, settings) -
 
     assert (lib_folder / ".cover.png").read_bytes() == b"old cover"
     assert not inbox_folder.exists()
+
+
+def test_ingest_does_not_overwrite_existing_trash_file(ingest_dirs: Path, settings) -> None:
+    folder_name = "Trash Series (2025)"
+    inbox_folder = Path(settings.EXTRACTION_FOLDER) / folder_name
+    inbox_folder.mkdir()
+    (inbox_folder / "image.jpg").write_bytes(b"new")
+    (inbox_folder / "other.jpg").write_bytes(b"undecided")
+
+    trash_folder = Path(settings.DISCARD_FOLDER) / folder_name
+    trash_folder.mkdir()
+    (trash_folder / "image.jpg").write_bytes(b"old")
+
+    ImageDecision.objects.create(folder=folder_name, filename="image.jpg", decision=ImageDecision.DECISION_DELETE)
+    ImageDecision.objects.create(folder=folder_name, filename="missing.jpg", decision=ImageDecision.DECISION_DELETE)
+
+    result = ingest_inbox_folder(folder_name)
+
+    assert result["moved_trash"] == 1
+    assert (trash_folder / "image.jpg").read_bytes() == b"old"
+    assert sorted(p.read_bytes() for p in trash_folder.iterdir()) == [b"new", b"old"]
+    assert result["remaining"] == 1
+
+
+def test_ingest_reports_moved_files_as_changed(ingest_dirs: Path, settings) -> None:
+    folder_name = "Clip (2025)"
+    inbox_folder = Path(settings.EXTRACTION_FOLDER) / folder_name
+    inbox_folder.mkdir()
+    (inbox_folder / "keep.jpg").write_bytes(b"keep")
+    (inbox_folder / "drop.jpg").write_bytes(b"drop")
+    ImageDecision.objects.create(folder=folder_name, filename="keep.jpg", decision=ImageDecision.DECISION_KEEP)
+    ImageDecision.objects.create(folder=folder_name, filename="drop.jpg", decision=ImageDecision.DECISION_DELETE)
+
+    changed: list[str] = []
+
+    def record(sender: object, path: str, **kwargs: object) -> None:
+        changed.append(path)
+
+    file_changed.connect(record)
+    try:
+        ingest_inbox_folder(folder_name)
+    finally:
+        file_changed.disconnect(record)
+
+    assert str(inbox_folder / "keep.jpg") in changed
+    assert str(inbox_folder / "drop.jpg") in changed
+    assert any(path.startswith(str(settings.WALLPAPERS_FOLDER)) for path in changed)
+
+
+def test_ingest_drops_decisions_of_moved_files_when_a_later_file_fails(
+    ingest_dirs: Path, settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    folder_name = "Clip (2025)"
+    inbox_folder = Path(settings.EXTRACTION_FOLDER) / folder_name
+    inbox_folder.mkdir()
+    (inbox_folder / "first.jpg").write_bytes(b"1")
+    (inbox_folder / "second.jpg").write_bytes(b"2")
+    ImageDecision.objects.create(folder=folder_name, filename="first.jpg", decision=ImageDecision.DECISION_KEEP)
+    ImageDecision.objects.create(folder=folder_name, filename="second.jpg", decision=ImageDecision.DECISION_KEEP)
+
+    from choose import services
+
+    real_render = services.render_pattern
+    calls: list[int] = []
+
+    def render_then_fail(pattern: str, values: dict[str, object]) -> str:
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("bad pattern")
+        return real_render(pattern, values)
+
+    monkeypatch.setattr(services, "render_pattern", render_then_fail)
+
+    with pytest.raises(RuntimeError, match="bad pattern"):
+        ingest_inbox_folder(folder_name)
+
+    assert not (inbox_folder / "first.jpg").exists()
+    assert list(ImageDecision.objects.filter(folder=folder_name).values_list("filename", flat=True)) == ["second.jpg"]
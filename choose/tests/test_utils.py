@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Iterator
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -8,6 +11,8 @@ from choose.services import format_section_title
 from choose.utils import (
     MediaFolder,
     add_version_suffix,
+    find_cover_filename,
+    list_image_stats,
     list_media_folders,
     parse_counter,
     parse_folder_name,
@@ -17,7 +22,7 @@ from choose.utils import (
     strip_version_suffix,
     validate_folder_name,
 )
-from kwc.utils.files import cache_token
+from kwc.utils.files import cache_token, safe_remove_many, safe_rename
 
 
 @pytest.fixture()
@@ -101,6 +106,81 @@ def test_cache_token_is_stable(temp_wallpapers_dir: Path) -> None:
     assert first == second
 
 
+def test_cache_token_skips_stat_for_recently_missing_path(temp_wallpapers_dir: Path) -> None:
+    missing = temp_wallpapers_dir / "later.jpg"
+    cache_token(missing)
+
+    with patch("kwc.utils.files.os.stat", side_effect=AssertionError("stat")):
+        cache_token(missing)
+
+    # Moving a file into place through safe_rename clears the negative entry
+    source = temp_wallpapers_dir / "incoming.jpg"
+    source.write_bytes(b"data")
+    safe_rename(source, missing)
+    assert cache_token(missing) == cache_token(missing)
+
+
+def test_safe_remove_many_attempts_every_path(temp_wallpapers_dir: Path) -> None:
+    first = temp_wallpapers_dir / "a.jpg"
+    second = temp_wallpapers_dir / "b.jpg"
+    first.write_bytes(b"a")
+    second.write_bytes(b"b")
+    blocker = temp_wallpapers_dir / "dir.jpg"
+    blocker.mkdir()
+
+    with pytest.raises(OSError, match=r"Unable to remove 1 file\(s\): .*dir\.jpg") as excinfo:
+        safe_remove_many([first, blocker, second, temp_wallpapers_dir / "missing.jpg"])
+
+    assert isinstance(excinfo.value.__cause__, IsADirectoryError)
+    assert not first.exists()
+    assert not second.exists()
+
+
+def test_safe_remove_many_keeps_failures_when_iteration_stops(temp_wallpapers_dir: Path) -> None:
+    blocker = temp_wallpapers_dir / "dir.jpg"
+    blocker.mkdir()
+
+    def paths() -> Iterator[Path]:
+        yield blocker
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError, match="cancelled") as excinfo:
+        safe_remove_many(paths())
+
+    assert len(excinfo.value.__notes__) == 1
+    assert "dir.jpg" in excinfo.value.__notes__[0]
+
+
+def test_list_image_stats_matches_cache_token(temp_wallpapers_dir: Path) -> None:
+    folder = _make_folder(
+        temp_wallpapers_dir,
+        "Show",
+        {"b.jpg": b"bb", "A.png": b"a", ".hidden.jpg": b"x", "notes.txt": b"n"},
+    )
+
+    stats = list_image_stats(folder)
+
+    assert list(stats) == ["A.png", "b.jpg"]
+    assert stats["b.jpg"].st_size == 2
+    assert cache_token(folder / "b.jpg", stats["b.jpg"]) == cache_token(folder / "b.jpg")
+
+
+def test_find_cover_filename_scans_folder_once(temp_wallpapers_dir: Path) -> None:
+    folder = _make_folder(temp_wallpapers_dir, "Show", {"b.jpg": b"b", "A.webp": b"a", "notes.txt": b"n"})
+    assert find_cover_filename(folder) == "A.webp"
+
+    (folder / ".cover.webp").write_bytes(b"w")
+    (folder / ".cover.png").write_bytes(b"p")
+    # Without a listing, covers and the first image both come from one scandir pass and no per-candidate stat
+    with (
+        patch("choose.utils.os.scandir", wraps=os.scandir) as scandir,
+        patch.object(Path, "is_file", side_effect=AssertionError("stat")),
+    ):
+        assert find_cover_filename(folder) == ".cover.png"
+    assert scandir.call_count == 1
+    assert find_cover_filename(folder, ["b.jpg"]) == ".cover.png"
+
+
 def test_parse_season_episode_with_numeric_episode() -> None:
     season, episode = parse_season_episode("Show Title S01E03.jpg")
     assert season == "01"
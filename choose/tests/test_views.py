@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import os
 import shutil
 import tempfile
+import threading
 from io import BytesIO
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from django.conf import settings
@@ -11,7 +14,17 @@ from django.test import TestCase
 from django.urls import reverse
 from PIL import Image
 
+from kwc.utils.files import cache_token, safe_remove
+
 from ..models import FolderProgress, ImageDecision
+from ..views import (
+    _prune_thumbnail_cache,
+    _store_thumbnail,
+    _thumbnail_memory_cache,
+    _ThumbnailMemoryCache,
+    _ThumbnailPruner,
+    _ThumbResult,
+)
 
 pytestmark = pytest.mark.django_db(transaction=True)
 
@@ -102,6 +115,164 @@ class MediaLibraryViewsTests(TestCase):
         with Image.open(BytesIO(response.content)) as image:
             self.assertLessEqual(image.width, 300)
 
+    def test_thumbnail_etag_changes_when_file_is_replaced_with_same_mtime(self) -> None:
+        folder_path = self.temp_dir / self.folder_name
+        source = folder_path / "frame01.jpg"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(WALLPAPERS_FOLDER=self.temp_dir, MIDDLEWARE=self._middleware):
+            first = self.client.get(url, {"w": 200})
+
+            stat = source.stat()
+            replacement = folder_path / "replacement.jpg"
+            self._write_image(replacement, size=(800, 600), color=(200, 10, 10))
+            os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            replacement.replace(source)
+
+            second = self.client.get(url, {"w": 200})
+
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        with Image.open(BytesIO(second.content)) as image:
+            self.assertEqual(image.size, (200, 150))
+
+    def test_thumbnail_revalidation_skips_rendering(self) -> None:
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame02.jpg"})
+        with self.settings(WALLPAPERS_FOLDER=self.temp_dir, MIDDLEWARE=self._middleware):
+            first = self.client.get(url, {"w": 240})
+            with patch("choose.views._render_thumbnail_cached", side_effect=AssertionError("rendered")):
+                second = self.client.get(url, {"w": 240}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 304)
+
+    def test_thumbnail_is_reused_from_disk_cache(self) -> None:
+        cache_dir = self.temp_dir / ".thumb-cache"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(
+            WALLPAPERS_FOLDER=self.temp_dir, THUMBNAIL_CACHE_FOLDER=str(cache_dir), MIDDLEWARE=self._middleware
+        ):
+            _thumbnail_memory_cache.clear()
+            first = self.client.get(url, {"w": 320})
+            self.assertEqual(len([p for p in cache_dir.rglob("*") if p.is_file()]), 1)
+
+            # A fresh process (empty in-memory LRU) must be served from disk without decoding again
+            _thumbnail_memory_cache.clear()
+            with patch("choose.views._render_thumbnail", side_effect=AssertionError("rendered")):
+                second = self.client.get(url, {"w": 320})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second["Content-Type"], "image/jpeg")
+        self.assertEqual(first.content, second.content)
+
+    def test_changed_source_replaces_its_disk_cache_entry(self) -> None:
+        cache_dir = self.temp_dir / ".thumb-cache"
+        source = self.temp_dir / self.folder_name / "frame01.jpg"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(
+            WALLPAPERS_FOLDER=self.temp_dir, THUMBNAIL_CACHE_FOLDER=str(cache_dir), MIDDLEWARE=self._middleware
+        ):
+            _thumbnail_memory_cache.clear()
+            first = self.client.get(url, {"w": 320})
+            Image.new("RGB", (64, 48), color=(0, 0, 255)).save(source)
+            stat = source.stat()
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            second = self.client.get(url, {"w": 320})
+
+        self.assertNotEqual(first.content, second.content)
+        self.assertEqual(len([p for p in cache_dir.rglob("*") if p.is_file()]), 1)
+
+    def test_only_linked_thumbnail_widths_are_persisted(self) -> None:
+        cache_dir = self.temp_dir / ".thumb-cache"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(
+            WALLPAPERS_FOLDER=self.temp_dir, THUMBNAIL_CACHE_FOLDER=str(cache_dir), MIDDLEWARE=self._middleware
+        ):
+            for query in ({"w": 181}, {"w": 182}, {"w": 320, "h": 200}):
+                response = self.client.get(url, query)
+                self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(cache_dir.exists())
+
+    def test_failed_thumbnail_write_leaves_no_temp_file(self) -> None:
+        cache_file = self.temp_dir / ".thumb-cache" / "ab" / "abcdef"
+        with patch("choose.views.os.replace", side_effect=OSError("disk full")):
+            _store_thumbnail(cache_file, "v1", b"data")
+
+        self.assertEqual(list(cache_file.parent.iterdir()), [])
+
+    def test_prune_removes_oldest_thumbnails_past_the_limit(self) -> None:
+        cache_dir = self.temp_dir / ".thumb-cache"
+        shard = cache_dir / "ab"
+        shard.mkdir(parents=True)
+        for age, name in enumerate(("newest", "middle", "oldest")):
+            entry = shard / name
+            entry.write_bytes(b"x" * 100)
+            os.utime(entry, (1_000_000 - age, 1_000_000 - age))
+
+        # An in-flight temp file of another worker is left alone even though it is not counted
+        (shard / ".tmp-inflight").write_bytes(b"x" * 100)
+
+        _prune_thumbnail_cache(cache_dir, max_bytes=250)
+
+        self.assertEqual(sorted(p.name for p in shard.iterdir()), [".tmp-inflight", "middle", "newest"])
+
+    def test_prune_runs_off_the_request_thread_at_most_once_per_interval(self) -> None:
+        pruner = _ThumbnailPruner()
+        started = threading.Event()
+        threads: list[threading.Thread] = []
+
+        def record(cache_root: Path, max_bytes: int) -> None:
+            threads.append(threading.current_thread())
+            started.set()
+
+        with patch("choose.views._prune_thumbnail_cache", side_effect=record):
+            pruner.maybe_start(self.temp_dir, 100)
+            self.assertTrue(started.wait(5))
+            pruner.maybe_start(self.temp_dir, 100)
+
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_removed_image_drops_its_disk_cached_thumbnails(self) -> None:
+        cache_dir = self.temp_dir / ".thumb-cache"
+        source = self.temp_dir / self.folder_name / "frame01.jpg"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(
+            WALLPAPERS_FOLDER=self.temp_dir, THUMBNAIL_CACHE_FOLDER=str(cache_dir), MIDDLEWARE=self._middleware
+        ):
+            self.client.get(url, {"w": 320})
+            self.client.get(url, {"w": 512})
+            self.assertEqual(len([p for p in cache_dir.rglob("*") if p.is_file()]), 2)
+
+            safe_remove(source)
+
+            self.assertEqual([p for p in cache_dir.rglob("*") if p.is_file()], [])
+
+    def test_memory_cache_evicts_by_size_and_replaces_stale_versions(self) -> None:
+        cache = _ThumbnailMemoryCache(max_bytes=10)
+        cache.put(("a.jpg", 100, 0), "v1", _ThumbResult(b"x" * 4, "image/jpeg"))
+        cache.put(("b.jpg", 100, 0), "v1", _ThumbResult(b"x" * 4, "image/jpeg"))
+        cache.put(("a.jpg", 100, 0), "v2", _ThumbResult(b"y" * 4, "image/jpeg"))
+
+        self.assertIsNone(cache.get(("a.jpg", 100, 0), "v1"))
+        self.assertEqual(cache.get(("a.jpg", 100, 0), "v2"), _ThumbResult(b"y" * 4, "image/jpeg"))
+
+        # b.jpg is now the least recently used entry and goes first once the byte budget is exceeded
+        cache.put(("c.jpg", 100, 0), "v1", _ThumbResult(b"z" * 4, "image/jpeg"))
+        self.assertIsNone(cache.get(("b.jpg", 100, 0), "v1"))
+        self.assertIsNotNone(cache.get(("c.jpg", 100, 0), "v1"))
+
+    def test_removed_image_drops_its_cached_thumbnails(self) -> None:
+        source = self.temp_dir / self.folder_name / "frame01.jpg"
+        url = reverse("wallpaper-thumbnail", kwargs={"folder": self.folder_name, "filename": "frame01.jpg"})
+        with self.settings(WALLPAPERS_FOLDER=self.temp_dir, MIDDLEWARE=self._middleware):
+            _thumbnail_memory_cache.clear()
+            self.client.get(url, {"w": 180})
+            version = cache_token(source)
+            self.assertIsNotNone(_thumbnail_memory_cache.get((str(source), 180, 0), version))
+
+            safe_remove(source)
+
+        self.assertIsNone(_thumbnail_memory_cache.get((str(source), 180, 0), version))
+
     def test_save_updates_progress_and_resumes_from_next_image(self) -> None:
         folder_path = self.temp_dir / self.folder_name
         for extra in ("frame03.jpg", "frame04.jpg", "frame05.jpg"):
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 import re
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import TypedDict
 from urllib.parse import quote, urlencode
@@ -11,7 +11,12 @@ from django.conf import settings
 
 from kwc.utils.files import cache_token
 
-from .constants import IMAGE_EXTS, SEASON_EPISODE_PATTERN
+from .constants import COVER_FILENAMES, IMAGE_EXTS, SEASON_EPISODE_PATTERN
+
+# Compiled once at import; these run per filename in every listing, save and ingest
+VERSION_SUFFIX_RE = re.compile(r"[A-Za-z]{1,3}$")
+COUNTER_RE = re.compile(r"(\d+)$")
+SEASON_EPISODE_RE = re.compile(SEASON_EPISODE_PATTERN, re.IGNORECASE)
 
 
 def parse_version_suffix(filename: str) -> tuple[str, str]:
@@ -40,12 +45,12 @@ def parse_version_suffix(filename: str) -> tuple[str, str]:
 
     # Pattern to match suffix: 1-2 characters at the end of the stem
     # We look for sequences of letters after the last number/space/tilde
-    match = re.search(r"([A-Za-z]{1,3})$", stem)
+    match = VERSION_SUFFIX_RE.search(stem)
 
     if not match:
         return ("", "")
 
-    suffix = match.group(1)
+    suffix = match.group(0)
 
     # Validate suffix:
     # 1. Must be 1-2 characters
@@ -76,7 +81,7 @@ def strip_version_suffix(filename: str) -> str:
     ext = os.path.splitext(filename)[1]
 
     # Remove any suffix (valid or invalid) that matches our pattern
-    stem_without_suffix = re.sub(r"[A-Za-z]{1,3}$", "", stem)
+    stem_without_suffix = VERSION_SUFFIX_RE.sub("", stem)
 
     return stem_without_suffix + ext
 
@@ -216,37 +221,79 @@ def parse_folder_name(folder_name: str) -> tuple[str, int | None]:
     return title, year
 
 
-def list_image_files(folder: Path) -> list[str]:
-    """Return all non-hidden image filenames in a folder, sorted case-insensitively."""
-    files: list[str] = []
+def _iter_image_entries(folder: Path) -> Iterator[os.DirEntry[str]]:
     with os.scandir(folder) as it:
         for e in it:
             if e.is_file() and not e.name.startswith("."):
                 _, ext = os.path.splitext(e.name)
                 if ext.lower() in IMAGE_EXTS:
-                    files.append(e.name)
+                    yield e
+
+
+def list_image_files(folder: Path) -> list[str]:
+    """Return all non-hidden image filenames in a folder, sorted case-insensitively."""
+    files = [e.name for e in _iter_image_entries(folder)]
     files.sort(key=lambda n: n.lower())
     return files
 
 
+def list_image_stats(folder: Path) -> dict[str, os.stat_result]:
+    """Return non-hidden image filenames mapped to their stat results, sorted case-insensitively.
+
+    Every file is stat'd exactly once during the scan, so the results can be handed to
+    :func:`wallpaper_url` / :func:`thumbnail_url` instead of stat'ing again per URL.
+    """
+    stats: dict[str, os.stat_result] = {}
+    for e in _iter_image_entries(folder):
+        try:
+            stats[e.name] = e.stat()
+        except FileNotFoundError:
+            continue
+    return dict(sorted(stats.items(), key=lambda item: item[0].lower()))
+
+
 def find_cover_filename(folder: Path, files: Iterable[str] | None = None) -> str | None:
     """Heuristic cover image: .cover.* if present, else first image file."""
-    for cand in (".cover.jpg", ".cover.jpeg", ".cover.png", ".cover.webp"):
-        p = folder / cand
-        if p.exists() and p.is_file():
-            return p.name
-    if files is None:
-        try:
-            files = list_image_files(folder)
-        except PermissionError:
-            return None
-    for name in files:
-        return name
-    return None
+    if files is not None:
+        for cand in COVER_FILENAMES:
+            if (folder / cand).is_file():
+                return cand
+        return next(iter(files), None)
+
+    # No listing supplied: look for covers and the first image in a single directory pass
+    covers: set[str] = set()
+    first: str | None = None
+    try:
+        with os.scandir(folder) as it:
+            for e in it:
+                name = e.name
+                if name in COVER_FILENAMES:
+                    if e.is_file():
+                        covers.add(name)
+                    continue
+                if name.startswith(".") or os.path.splitext(name)[1].lower() not in IMAGE_EXTS:
+                    continue
+                if e.is_file() and (first is None or name.lower() < first.lower()):
+                    first = name
+    except PermissionError:
+        return None
+    for cand in COVER_FILENAMES:
+        if cand in covers:
+            return cand
+    return first
 
 
-def wallpaper_url(folder: str, filename: str, *, root: Path | None = None) -> str:
-    """Return a cache-busted URL for a wallpaper image."""
+def wallpaper_url(
+    folder: str,
+    filename: str,
+    *,
+    root: Path | None = None,
+    stat: os.stat_result | None = None,
+) -> str:
+    """Return a cache-busted URL for a wallpaper image.
+
+    *stat* may carry the file's already-known stat result to skip re-stat'ing it.
+    """
     actual_root = root or wallpapers_root()
 
     # Check if we are serving from the inbox
@@ -256,20 +303,22 @@ def wallpaper_url(folder: str, filename: str, *, root: Path | None = None) -> st
         base = f"/wallpapers/{quote(folder)}/{quote(filename)}"
 
     path = actual_root / folder / filename
-    return f"{base}?v={cache_token(path)}"
+    return f"{base}?v={cache_token(path, stat)}"
 
 
-def thumbnail_url(
+def thumbnail_url(  # noqa: PLR0913
     folder: str,
     filename: str | None,
     *,
     width: int | None = None,
     height: int | None = None,
     root: Path | None = None,
+    stat: os.stat_result | None = None,
 ) -> str | None:
     """Return a cache-busted URL for a resized wallpaper thumbnail.
 
     Thumbnails are generated on-demand and are not persisted alongside wallpapers.
+    *stat* may carry the file's already-known stat result to skip re-stat'ing it.
     """
 
     if not filename:
@@ -289,7 +338,7 @@ def thumbnail_url(
         params["w"] = str(width)
     if height and height > 0:
         params["h"] = str(height)
-    params["v"] = cache_token(path)
+    params["v"] = cache_token(path, stat)
 
     query = urlencode(params)
     return f"{base}?{query}" if query else base
@@ -310,7 +359,7 @@ def parse_counter(filename: str) -> str:
     base_name = strip_version_suffix(filename)
     stem, _ = os.path.splitext(base_name)
 
-    match = re.search(r"(\d+)$", stem)
+    match = COUNTER_RE.search(stem)
     return match.group(1) if match else ""
 
 
@@ -325,8 +374,7 @@ def parse_season_episode(filename: str) -> tuple[str, str]:
         Season can be numeric (e.g., "01") or empty (for episode-only).
         Episode can be numeric, special like "IN"/"OU", or empty string (for season-only).
     """
-    pattern = re.compile(SEASON_EPISODE_PATTERN, re.IGNORECASE)
-    match = pattern.search(filename)
+    match = SEASON_EPISODE_RE.search(filename)
     if match:
         season = match.group("season") or ""  # Season is optional, may be None
         # Episode can be in either "episode" group (when season present) or "ep_only" group
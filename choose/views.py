@@ -1,12 +1,21 @@
+import contextlib
+import hashlib
 import logging
+import math
 import os
 import shutil
-from functools import lru_cache
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from io import BytesIO
 from pathlib import Path
+from stat import S_ISREG
 from typing import Any, NamedTuple, cast
 
+from django.conf import settings
 from django.db import transaction
+from django.dispatch import receiver
 from django.http import (
     Http404,
     HttpRequest,
@@ -20,8 +29,16 @@ from django.utils.http import http_date, parse_http_date
 from django.views.decorators.http import require_GET, require_POST
 from PIL import Image, ImageOps
 
+from kwc.utils.files import cache_token, file_changed
+
 from .api import APIError, DecisionPayload, apply_decisions, parse_decision_request
-from .constants import THUMB_CACHE_SIZE, THUMB_MAX_DIMENSION
+from .constants import (
+    THUMB_CACHE_MAX_BYTES,
+    THUMB_MAX_DIMENSION,
+    THUMB_PERSISTED_WIDTHS,
+    THUMB_PRUNE_INTERVAL,
+    THUMB_TMP_GRACE,
+)
 from .models import ImageDecision
 from .services import ingest_inbox_folder, list_gallery_images, load_folder_context
 from .utils import (
@@ -166,10 +183,13 @@ def _lightbox_view(request: HttpRequest, folder: str, filename: str, root: Path
 
     # Get file info
     image_path = actual_root / safe_name / safe_filename
-    file_size = image_path.stat().st_size if image_path.exists() else 0
+    try:
+        file_size = image_path.stat().st_size
+    except OSError:
+        file_size = 0
     file_ext = os.path.splitext(safe_filename)[1].lstrip(".")
 
-    # Get image dimensions
+    # Image.open only parses the header; the pixels are never decoded here
     try:
         with Image.open(image_path) as img:
             width, height = img.size  # type: ignore[attr-defined]
@@ -251,6 +271,9 @@ def inbox_folder(request: HttpRequest, folder: str) -> HttpResponse:
     return _folder_view(request, folder, root=extraction_root(), is_inbox=True)
 
 
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
 class _ThumbResult(NamedTuple):
     data: bytes
     content_type: str
@@ -268,13 +291,232 @@ def _sanitize_dimension(value: str | None) -> int:
     return max(16, min(dim, THUMB_MAX_DIMENSION))
 
 
-@lru_cache(maxsize=THUMB_CACHE_SIZE)
-def _render_thumbnail_cached(path_str: str, width: int, height: int, mtime_ns: int) -> _ThumbResult:
+class _ThumbnailMemoryCache:
+    """Thread-safe LRU of rendered thumbnails, bounded by their total size in bytes.
+
+    Entries are keyed by rendition (path, width, height) and remember the source version they were rendered
+    from, so a changed source replaces its stale entry instead of sitting next to it until evicted.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, int, int], tuple[str, _ThumbResult]] = OrderedDict()
+        self._by_path: dict[str, set[tuple[str, int, int]]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, int, int], version: str) -> _ThumbResult | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple[str, int, int], version: str, result: _ThumbResult) -> None:
+        size = len(result.data)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (version, result)
+            self._by_path.setdefault(key[0], set()).add(key)
+            self._size += size
+            while self._size > self._max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def discard_path(self, path: str) -> None:
+        """Drop every rendition of *path*."""
+        with self._lock:
+            for key in list(self._by_path.get(path, ())):
+                self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self._size = 0
+
+    def _pop(self, key: tuple[str, int, int]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= len(entry[1].data)
+        keys = self._by_path[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_path[key[0]]
+
+
+_thumbnail_memory_cache = _ThumbnailMemoryCache(THUMB_CACHE_MAX_BYTES)
+
+
+@receiver(file_changed)
+def _forget_changed_thumbnails(sender: object, path: str, **kwargs: Any) -> None:
+    # Deleted, kept or renamed images release their thumbnails immediately, in memory and on disk; nothing would
+    # ever request a rendition of a path that no longer holds the image again
+    _thumbnail_memory_cache.discard_path(path)
+    for width in THUMB_PERSISTED_WIDTHS:
+        cache_file = _thumbnail_cache_file(path, width, 0)
+        if cache_file is None:
+            return
+        try:
+            cache_file.unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("Unable to drop cached thumbnail %s: %s", cache_file, exc)
+
+
+def _render_thumbnail_cached(path_str: str, width: int, height: int, version: str) -> _ThumbResult:
+    # *version* is the file's cache_token (mtime, size, inode): a rename that lands a different file on the same
+    # path within the filesystem's mtime granularity still gets a fresh render.
+    key = (path_str, width, height)
+    cached = _thumbnail_memory_cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    cache_file = _thumbnail_cache_file(path_str, width, height)
+    data = _load_thumbnail(cache_file, version) if cache_file is not None else None
+    if data is not None:
+        result = _ThumbResult(data, "image/png" if data.startswith(_PNG_SIGNATURE) else "image/jpeg")
+    else:
+        result = _render_thumbnail(path_str, width, height)
+        if cache_file is not None:
+            _store_thumbnail(cache_file, version, result.data)
+    _thumbnail_memory_cache.put(key, version, result)
+    return result
+
+
+def _thumbnail_cache_file(path_str: str, width: int, height: int) -> Path | None:
+    """Return where the persistent thumbnail cache keeps this rendition, or None when it is not persisted.
+
+    Only the widths in THUMB_PERSISTED_WIDTHS are kept on disk; any other size is rendered into the in-memory
+    LRU alone. The name only depends on the source path and size, so a changed source overwrites its old
+    rendition instead of leaving it behind; the version it was rendered from is stored in the file itself.
+    """
+    cache_root = getattr(settings, "THUMBNAIL_CACHE_FOLDER", "")
+    if not cache_root or height or width not in THUMB_PERSISTED_WIDTHS:
+        return None
+    key = hashlib.sha256(f"{path_str}\0{width}x{height}".encode()).hexdigest()
+    return Path(cache_root) / key[:2] / key
+
+
+def _load_thumbnail(cache_file: Path, version: str) -> bytes | None:
+    # Entries are "<version>\n<image bytes>"; anything else (missing, stale, truncated) is a miss
+    try:
+        raw = cache_file.read_bytes()
+    except OSError:
+        return None
+    header, sep, data = raw.partition(b"\n")
+    if not sep or header != version.encode():
+        return None
+    return data
+
+
+def _store_thumbnail(cache_file: Path, version: str, data: bytes) -> None:
+    # Write to a sibling temp file and rename so concurrent workers never read a partial thumbnail
+    tmp_name = ""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_file.parent, prefix=".tmp-", delete=False) as tmp:
+            tmp_name = tmp.name
+            tmp.write(version.encode() + b"\n")
+            tmp.write(data)
+        os.replace(tmp_name, cache_file)
+        tmp_name = ""
+    except OSError as exc:
+        logger.warning("Unable to persist thumbnail %s: %s", cache_file, exc)
+        return
+    finally:
+        # Whatever failed after the temp file was created, do not leave it behind in the cache
+        if tmp_name:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+    _thumbnail_pruner.maybe_start(cache_file.parent.parent, settings.THUMBNAIL_CACHE_MAX_MB * 1024 * 1024)
+
+
+class _ThumbnailPruner:
+    """Run :func:`_prune_thumbnail_cache` in a background thread, at most once per THUMB_PRUNE_INTERVAL.
+
+    The scan stats every persisted thumbnail, so it never runs on the request thread that triggered it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self._thread: threading.Thread | None = None
+
+    def maybe_start(self, cache_root: Path, max_bytes: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_at or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._next_at = now + THUMB_PRUNE_INTERVAL
+            self._thread = threading.Thread(
+                target=_prune_thumbnail_cache, args=(cache_root, max_bytes), name="thumb-prune", daemon=True
+            )
+            self._thread.start()
+
+
+_thumbnail_pruner = _ThumbnailPruner()
+
+
+def _prune_thumbnail_cache(cache_root: Path, max_bytes: int) -> None:
+    """Delete the oldest persisted thumbnails until the cache fits in *max_bytes*."""
+    entries: list[tuple[float, int, str]] = []
+    total = 0
+    tmp_cutoff = time.time() - THUMB_TMP_GRACE
+    try:
+        with os.scandir(cache_root) as shards:
+            for shard in shards:
+                if not shard.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(shard.path) as files:
+                    for entry in files:
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if entry.name.startswith(".tmp-") and stat.st_mtime > tmp_cutoff:
+                            # Another worker may be about to rename this into place
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+    except OSError as exc:
+        logger.warning("Unable to scan thumbnail cache %s: %s", cache_root, exc)
+        return
+    if total <= max_bytes:
+        return
+
+    # Trim to 90% of the limit so the cache has headroom until the next scheduled scan
+    target = max_bytes * 9 // 10
+    entries.sort()
+    for _mtime, size, path in entries:
+        if total <= target:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logger.warning("Unable to prune thumbnail %s: %s", path, exc)
+            continue
+        total -= size
+
+
+def _render_thumbnail(path_str: str, width: int, height: int) -> _ThumbResult:
     path = Path(path_str)
     with Image.open(path) as img:
-        img = ImageOps.exif_transpose(img)
         max_w = width if width > 0 else THUMB_MAX_DIMENSION
         max_h = height if height > 0 else THUMB_MAX_DIMENSION
+        # exif_transpose loads the full-size pixels, which defeats the draft() call Image.thumbnail makes
+        # internally. Ask JPEG for a DCT-scaled decode first; the ratio covers both orientations so an EXIF
+        # rotation can never leave the draft smaller than the requested box.
+        src_w, src_h = img.size
+        ratio = max(min(max_w / src_w, max_h / src_h), min(max_w / src_h, max_h / src_w))
+        if ratio < 1:
+            # Keep a 2x margin, matching Image.thumbnail's default reducing_gap, so LANCZOS has detail to work with
+            img.draft(None, (math.ceil(src_w * ratio * 2), math.ceil(src_h * ratio * 2)))
+        img = ImageOps.exif_transpose(img)
         img.thumbnail((max_w, max_h), Image.Resampling.LANCZOS)
 
         has_alpha = img.mode in ("LA", "RGBA") or (img.mode == "P" and "transparency" in img.info)
@@ -295,7 +537,7 @@ def _render_thumbnail_cached(path_str: str, width: int, height: int, mtime_ns: i
 
 @require_GET
 def thumbnail(request: HttpRequest, folder: str, filename: str) -> HttpResponse:
-    """Serve a resized thumbnail for a wallpaper without storing it on disk."""
+    """Serve a resized thumbnail for a wallpaper, rendered on demand and cached in memory and on disk."""
     return _thumbnail_view(request, folder, filename)
 
 
@@ -318,21 +560,21 @@ def _thumbnail_view(request: HttpRequest, folder: str, filename: str, root: Path
 
     actual_root = root or wallpapers_root()
     source = actual_root / folder / safe_filename
-    if not source.exists() or not source.is_file():
+    try:
+        stat = source.stat()
+    except OSError:
+        raise Http404("Image not found") from None
+    if not S_ISREG(stat.st_mode):
         raise Http404("Image not found")
 
-    stat = source.stat()
+    version = cache_token(source, stat)
     width = _sanitize_dimension(request.GET.get("w"))
     height = _sanitize_dimension(request.GET.get("h"))
     if width <= 0 and height <= 0:
         width = 512
 
-    try:
-        result = _render_thumbnail_cached(str(source), width, height, stat.st_mtime_ns)
-    except OSError:
-        raise Http404("Unable to generate thumbnail") from None
-
-    etag = f'W/"thumb-{stat.st_mtime_ns:x}-{width}-{height}"'
+    # Answer revalidations before rendering; a 304 needs no thumbnail bytes
+    etag = f'W/"thumb-{version}-{width}-{height}"'
     if request.headers.get("If-None-Match") == etag:
         return HttpResponseNotModified()
     ims = request.headers.get("If-Modified-Since")
@@ -344,6 +586,11 @@ def _thumbnail_view(request: HttpRequest, folder: str, filename: str, root: Path
             # Ignore invalid or out-of-range If-Modified-Since headers and fall back to a normal response
             pass
 
+    try:
+        result = _render_thumbnail_cached(str(source), width, height, version)
+    except OSError:
+        raise Http404("Unable to generate thumbnail") from None
+
     content_length = len(result.data)
     response = HttpResponse(result.data, content_type=result.content_type)
     if request.method == "HEAD":
@@ -383,12 +630,14 @@ def decide_api(request: HttpRequest, folder: str) -> JsonResponse:
     if decision == "":
         ImageDecision.objects.filter(folder=safe_name, filename=filename).delete()
         return JsonResponse({"ok": True, "folder": safe_name, "filename": filename, "decision": ""})
-    obj, _created = ImageDecision.objects.update_or_create(
-        folder=safe_name,
-        filename=filename,
-        defaults={"decision": decision},
+    # A single INSERT ... ON CONFLICT DO UPDATE, instead of update_or_create's SELECT FOR UPDATE then save
+    ImageDecision.objects.bulk_create(
+        [ImageDecision(folder=safe_name, filename=filename, decision=decision)],
+        update_conflicts=True,
+        unique_fields=["folder", "filename"],
+        update_fields=["decision", "decided_at"],
     )
-    return JsonResponse({"ok": True, "folder": obj.folder, "filename": obj.filename, "decision": obj.decision})
+    return JsonResponse({"ok": True, "folder": safe_name, "filename": filename, "decision": decision})
 
 
 @require_POST
@@ -1,12 +1,13 @@
 import logging
 import os
 import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from kwc.utils.files import safe_remove, safe_rename
+from kwc.utils.files import safe_remove_many, safe_rename
 
-from .extractor import CancellationToken, CancelledException
+from .extractor import CancellationToken, CancelledException, configured_max_workers
 from .utils import render_pattern
 
 if TYPE_CHECKING:
@@ -79,7 +80,11 @@ def process_deduplication(
         # default score_threshold is 0.9 for CNN, which is reasonable for "obvious duplicates"
         # The user said "Process should be light, only deleting the most obvious duplicates"
         # We can adjust threshold if needed, but default is usually fine.
-        encodings = cnn.encode_images(image_dir=str(output_dir))
+        # Encoding is the CPU-heavy part, but each encoder worker is a DataLoader process forked from this job
+        # thread inside a threaded web worker. Only fan out when a worker count was configured explicitly;
+        # otherwise encode in-process (0, imagededup's own default).
+        num_workers = configured_max_workers(job.params.get("max_workers")) or 0
+        encodings = cnn.encode_images(image_dir=str(output_dir), num_enc_workers=num_workers)
 
         if cancel_token and cancel_token.is_cancelled():
             raise CancelledException()
@@ -124,11 +129,14 @@ def process_deduplication(
 
     logger.info(f"Found {len(files_to_delete)} duplicates to delete out of {len(encodings)} images")
 
-    # Delete files
-    for fname in files_to_delete:
-        if cancel_token and cancel_token.is_cancelled():
-            raise CancelledException()
-        safe_remove(output_dir / fname)
+    # Delete files; safe_remove_many pulls paths lazily, so a cancellation still stops before the next delete
+    def paths_to_delete() -> Iterator[Path]:
+        for fname in files_to_delete:
+            if cancel_token and cancel_token.is_cancelled():
+                raise CancelledException()
+            yield output_dir / fname
+
+    safe_remove_many(paths_to_delete())
 
     # Renumber images to fill gaps if we deleted anything
     if files_to_delete:
@@ -179,8 +187,11 @@ def _renumber_images(job: "ExtractionJob", cancel_token: CancellationToken | Non
         "episode": params.get("episode", ""),
     }
 
-    # List all image files (ignoring hidden files like .cover.jpg)
-    files = sorted([f for f in output_dir.iterdir() if f.is_file() and not f.name.startswith(".")])
+    # List all image files (ignoring hidden files like .cover.jpg) in one directory pass; scandir entries carry
+    # their file type, so no per-file stat is needed
+    with os.scandir(output_dir) as it:
+        names = sorted(entry.name for entry in it if not entry.name.startswith(".") and entry.is_file())
+    files = [output_dir / name for name in names]
 
     if not files:
         return
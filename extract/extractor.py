@@ -62,64 +62,43 @@ def _find_highest_counter(output_dir: Path, pattern: str, context: Mapping[str,
     Find the highest counter value in existing files that match the pattern.
     Returns 0 if no matching files are found or if the directory doesn't exist.
     """
-    if not output_dir.exists():
+    # Render the pattern once with a sentinel counter (unlikely to collide) and split around it; every file is then
+    # matched against the same prefix/suffix instead of re-rendering the pattern per directory entry.
+    test_counter = 999999
+    try:
+        test_rendered = render_pattern(pattern, {**context, "counter": test_counter})
+    except Exception:
         return 0
 
-    # We need to determine which files match our pattern by rendering it with different counters
-    # and comparing. Since we don't know the range, we'll iterate through existing files and try
-    # to extract the counter by comparing against the pattern.
+    counter_str = str(test_counter)
+    if counter_str not in test_rendered:
+        # Pattern doesn't include counter
+        return 0
 
+    prefix, suffix = test_rendered.split(counter_str, 1)
     highest = 0
 
     try:
-        for entry in output_dir.iterdir():
-            if not entry.is_file():
-                continue
-
-            filename = entry.name
-
-            # Try to extract counter by testing various counter values
-            # We'll render the pattern with different counters and see which one matches the filename
-            # Since filenames use zero-padding, we need to handle that
-
-            # First, determine if the filename could match by rendering with a dummy counter
-            # and checking if the non-counter parts match
-
-            # Strategy: Generate pattern with counter=999999 (unlikely to collide)
-            # Replace that number with a regex and match
-            test_counter = 999999
-            try:
-                test_rendered = render_pattern(pattern, {**context, "counter": test_counter})
-            except Exception:
-                continue
-
-            # Find where the counter appears in the rendered pattern
-            counter_str = str(test_counter)
-            if counter_str not in test_rendered:
-                # Pattern doesn't include counter, skip
-                continue
-
-            # Split the rendered pattern into parts before and after the counter
-            parts = test_rendered.split(counter_str, 1)
-            if len(parts) != 2:
-                continue
-
-            prefix, suffix = parts
-
-            # Check if the filename matches the pattern structure
-            if not filename.startswith(prefix) or not filename.endswith(suffix):
-                continue
-
-            # Extract the counter part from the filename
-            counter_part = filename[len(prefix) : -len(suffix)] if suffix else filename[len(prefix) :]
-
-            # Try to parse it as an integer
-            try:
-                counter = int(counter_part)
-                highest = max(highest, counter)
-            except ValueError:
-                continue
+        with os.scandir(output_dir) as it:
+            for entry in it:
+                filename = entry.name
 
+                # Check the name first: it is free, while is_file() may need a stat on filesystems without d_type
+                if not filename.startswith(prefix) or not filename.endswith(suffix) or not entry.is_file():
+                    continue
+
+                # Extract the counter part from the filename
+                counter_part = filename[len(prefix) : -len(suffix)] if suffix else filename[len(prefix) :]
+
+                # Try to parse it as an integer
+                try:
+                    counter = int(counter_part)
+                    highest = max(highest, counter)
+                except ValueError:
+                    continue
+
+    except FileNotFoundError:
+        return 0
     except OSError as e:
         logger.warning("Error reading directory %s: %s", output_dir, e)
 
@@ -186,6 +165,41 @@ class ExtractParams:
     cancel_token: CancellationToken | None = None
 
 
+def _positive_workers(value: object) -> int | None:
+    if value is None:
+        return None
+    try:
+        workers = int(value)  # type: ignore[call-overload]
+    except (TypeError, ValueError):
+        return None
+    return workers if workers > 0 else None
+
+
+def configured_max_workers(requested: object = None) -> int | None:
+    """Return the explicitly configured worker count, or None when nothing was configured.
+
+    Precedence: an explicit positive *requested* value, then ``settings.EXTRACT_MAX_WORKERS``.
+    """
+    max_workers = _positive_workers(requested)
+    if max_workers is None:
+        max_workers = _positive_workers(getattr(settings, "EXTRACT_MAX_WORKERS", None))
+    return max_workers
+
+
+def resolve_max_workers(requested: object = None) -> int:
+    """Return the worker count for CPU-bound job stages.
+
+    The :func:`configured_max_workers` value when there is one, otherwise ``os.cpu_count()``.
+    """
+    max_workers = configured_max_workers(requested)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+        logger.debug("Using default max workers: %d", max_workers)
+    else:
+        logger.debug("Using configured max workers: %d", max_workers)
+    return max_workers
+
+
 def extract(
     *,
     params: ExtractParams,
@@ -260,30 +274,8 @@ def extract(
 
     # Use processes to parallelize decoding
     if total:
-        max_workers = params.max_workers
-        if max_workers is not None:
-            try:
-                max_workers = int(max_workers)
-            except (TypeError, ValueError):
-                max_workers = None
-            else:
-                if max_workers <= 0:
-                    max_workers = None
-        if max_workers is None:
-            max_workers = getattr(settings, "EXTRACT_MAX_WORKERS", None)
-            if max_workers is not None:
-                try:
-                    max_workers = int(max_workers)
-                except (TypeError, ValueError):
-                    max_workers = None
-                else:
-                    if max_workers <= 0:
-                        max_workers = None
-        if max_workers is None:
-            max_workers = os.cpu_count() or 1
-            logger.debug("Using default max workers: %d", max_workers)
-        else:
-            logger.debug("Using configured max workers: %d", max_workers)
+        # Worker processes cost a fork and a Django import each; never start more than there are frames to hand them
+        max_workers = min(resolve_max_workers(params.max_workers), total)
         with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
             futures = {executor.submit(_extract_frame, arg): arg for arg in frame_args}
             for f in concurrent.futures.as_completed(futures):
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import shutil
 import threading
+import time
 from collections.abc import Callable
 from contextlib import contextmanager
 from io import BytesIO
@@ -18,6 +19,9 @@ from .models import ExtractionJob
 
 logger = logging.getLogger(__name__)
 
+# The job page polls once a second; writing progress more often than this only adds SQLite write-lock contention
+PROGRESS_WRITE_INTERVAL = 0.5
+
 
 class JobRunner:
     """Manage extraction job execution and lifecycle in background threads."""
@@ -146,7 +150,15 @@ class JobRunner:
             cancel_token=cancel_token,
         )
 
+        last_progress_write = -PROGRESS_WRITE_INTERVAL
+
         def on_progress(done: int, total: int) -> None:
+            nonlocal last_progress_write
+            now = time.monotonic()
+            # Always record the final frame so a finished extraction never shows a stale count
+            if done < total and now - last_progress_write < PROGRESS_WRITE_INTERVAL:
+                return
+            last_progress_write = now
             self.model.objects.filter(pk=job_id).update(
                 total_steps=max(total, 1),
                 current_step=done,
@@ -279,6 +279,54 @@ class TestProcessDeduplication:
         assert (tmp_path / "img1.jpg").exists()
         assert (tmp_path / "img2.jpg").exists()
 
+    def test_reports_files_it_could_not_delete(self, tmp_path: Path) -> None:
+        """Should keep deleting and name every duplicate that could not be removed."""
+        job = FakeJob(tmp_path)
+        create_test_image(tmp_path / "img1.jpg", (100, 100))
+        create_test_image(tmp_path / "img2.jpg", (50, 50))
+        (tmp_path / "img3.jpg").mkdir()  # a directory can never be removed as a file
+
+        mock_cnn_instance = MagicMock()
+        mock_cnn_instance.encode_images.return_value = {"img1.jpg": "e1", "img2.jpg": "e2", "img3.jpg": "e3"}
+        mock_cnn_instance.find_duplicates.return_value = {
+            "img1.jpg": ["img2.jpg", "img3.jpg"],
+            "img2.jpg": ["img1.jpg"],
+            "img3.jpg": ["img1.jpg"],
+        }
+
+        with patch("imagededup.methods.CNN", return_value=mock_cnn_instance):
+            # The directory's st_size would otherwise make it the "best" image of the cluster
+            with patch("extract.deduplication._get_best_image", return_value="img1.jpg"):
+                with pytest.raises(OSError, match=r"Unable to remove 1 file\(s\): .*img3\.jpg"):
+                    process_deduplication(job, cancel_token=None)  # type: ignore[arg-type]
+
+        assert (tmp_path / "img1.jpg").exists()
+        assert not (tmp_path / "img2.jpg").exists()
+
+    def test_stops_deleting_once_cancelled(self, tmp_path: Path) -> None:
+        """Should check cancellation before every delete, not only before the first."""
+        job = FakeJob(tmp_path)
+        for name, size in (("img1.jpg", (120, 120)), ("img2.jpg", (60, 60)), ("img3.jpg", (50, 50))):
+            create_test_image(tmp_path / name, size)
+
+        cancel_token = CancellationToken()
+        mock_cnn_instance = MagicMock()
+        mock_cnn_instance.encode_images.return_value = {"img1.jpg": "e1", "img2.jpg": "e2", "img3.jpg": "e3"}
+        mock_cnn_instance.find_duplicates.return_value = {"img1.jpg": ["img2.jpg", "img3.jpg"]}
+
+        removed: list[str] = []
+
+        def remove_then_cancel(path: Path) -> None:
+            removed.append(Path(path).name)
+            cancel_token.cancel()
+
+        with patch("imagededup.methods.CNN", return_value=mock_cnn_instance):
+            with patch("kwc.utils.files.safe_remove", side_effect=remove_then_cancel):
+                with pytest.raises(CancelledException):
+                    process_deduplication(job, cancel_token)  # type: ignore[arg-type]
+
+        assert len(removed) == 1
+
     def test_respects_cancellation_during_processing(self, tmp_path: Path) -> None:
         """Should respect cancellation token during duplicate processing."""
         job = FakeJob(tmp_path)
@@ -317,6 +365,30 @@ class TestProcessDeduplication:
         call_kwargs = mock_cnn_instance.find_duplicates.call_args[1]
         assert call_kwargs["min_similarity_threshold"] == 0.95
 
+    @pytest.mark.parametrize(
+        ("job_workers", "setting_workers", "expected"),
+        [(None, None, 0), (None, 3, 3), (2, 3, 2)],
+    )
+    def test_encodes_with_configured_workers_only(
+        self, tmp_path: Path, settings, job_workers: int | None, setting_workers: int | None, expected: int
+    ) -> None:
+        """Should only fan encoding out to worker processes when a worker count was configured."""
+        settings.EXTRACT_MAX_WORKERS = setting_workers
+        job = FakeJob(tmp_path)
+        if job_workers is not None:
+            job.params["max_workers"] = job_workers
+        create_test_image(tmp_path / "img1.jpg")
+
+        mock_cnn_instance = MagicMock()
+        mock_cnn_instance.encode_images.return_value = {"img1.jpg": "encoding1"}
+        mock_cnn_instance.find_duplicates.return_value = {"img1.jpg": []}
+
+        with patch("imagededup.methods.CNN", return_value=mock_cnn_instance):
+            with patch("extract.extractor.os.cpu_count", return_value=64):
+                process_deduplication(job, cancel_token=None)  # type: ignore[arg-type]
+
+        mock_cnn_instance.encode_images.assert_called_once_with(image_dir=str(tmp_path), num_enc_workers=expected)
+
     def test_environment_initialization(self, tmp_path: Path) -> None:
         """Should initialize environment variables for CNN."""
         job = FakeJob(tmp_path)
@@ -148,6 +148,23 @@ def test_job_runner_marks_job_done(monkeypatch: pytest.MonkeyPatch) -> None:
     assert len(close_calls) >= 2
 
 
+def test_job_runner_throttles_progress_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    job = make_fake_job()
+    monkeypatch.setattr(job_runner_module, "close_old_connections", lambda: None)
+
+    def fake_extract(*, params: ExtractParams, on_progress: Callable[[int, int], None]) -> int:
+        for done in range(101):
+            on_progress(done, 100)
+        return 100
+
+    runner, manager = _configure_runner(job, fake_extract)
+    runner.start_job(job.id)
+
+    progress_writes = [call["current_step"] for call in manager.update_calls if "current_step" in call]
+    assert progress_writes == [0, 100]
+    assert job.status == ExtractionJob.Status.DONE
+
+
 def test_job_runner_records_error(monkeypatch: pytest.MonkeyPatch) -> None:
     job = make_fake_job()
 
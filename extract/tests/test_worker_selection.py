@@ -18,6 +18,7 @@ class ExtractorWorkerSelectionTests(SimpleTestCase):
         cpu_count_value: int,
         expected_workers: int,
         params_override: int | None = None,
+        frame_count: int = 8,
     ) -> None:
         class FakeFuture:
             def result(self) -> None:
@@ -55,7 +56,9 @@ class ExtractorWorkerSelectionTests(SimpleTestCase):
 
             params = ExtractParams(video=video, output_dir=output, max_workers=params_override)
             with override_settings(EXTRACT_MAX_WORKERS=override):
-                with patch("extract.extractor.get_iframe_timestamps", return_value=[0.0]):
+                with patch(
+                    "extract.extractor.get_iframe_timestamps", return_value=[float(i) for i in range(frame_count)]
+                ):
                     with patch("extract.extractor.render_pattern", side_effect=lambda pattern, values: "frame.jpg"):
                         with patch(
                             "extract.extractor.concurrent.futures.ProcessPoolExecutor", side_effect=executor_factory
@@ -80,3 +83,6 @@ class ExtractorWorkerSelectionTests(SimpleTestCase):
             expected_workers=3,
             params_override=3,
         )
+
+    def test_caps_workers_at_frame_count(self) -> None:
+        self._run_extract_with_patched_executor(override=None, cpu_count_value=16, expected_workers=2, frame_count=2)
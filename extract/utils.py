@@ -2,10 +2,11 @@ from __future__ import annotations
 
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 
-from django.template import Context, Engine
+from django.template import Context, Engine, Template
 from ffmpeg import FFmpeg
 
 logger = logging.getLogger(__name__)
@@ -99,8 +100,13 @@ def render_pattern(pattern: str, values: dict[str, object]) -> str:
     The pattern can use template variables like {{ title }}, {{ counter }}, {{ year }}, {{ season }}, {{ episode }}
     and the custom filter "pad" from extract.templatetags.naming, for example: {{ counter|pad:4 }}.
     """
-    tpl = PATTERN_ENGINE.from_string(pattern)
-    return tpl.render(Context(values))  # type: ignore[no-any-return]
+    return _compile_pattern(pattern).render(Context(values))  # type: ignore[no-any-return]
+
+
+@lru_cache(maxsize=64)
+def _compile_pattern(pattern: str) -> Template:
+    # Callers render the same pattern once per frame/file; parse it once instead of on every call.
+    return PATTERN_ENGINE.from_string(pattern)
 
 
 def check_is_hdr(video: Path) -> bool:
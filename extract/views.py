@@ -11,12 +11,6 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.decorators.http import require_GET, require_POST
 
-try:
-    # Optional import guard; will raise at runtime if missing
-    from guessit import guessit as _guessit
-except Exception:  # pragma: no cover
-    _guessit = None
-
 from choose.utils import extraction_root, find_cover_filename, list_media_folders
 
 from . import tmdb
@@ -239,7 +233,10 @@ def guess_api(request: HttpRequest) -> JsonResponse:
     - path: full file path (we will use the basename)
     - name: optional explicit name to parse (takes precedence over path)
     """
-    if _guessit is None:
+    # guessit is slow to import and only this endpoint needs it, so it is loaded on the first guess request
+    try:
+        from guessit import guessit
+    except Exception:  # pragma: no cover - optional import guard
         return JsonResponse({"error": "guessit_not_installed"}, status=500)
 
     name = request.GET.get("name")
@@ -250,7 +247,7 @@ def guess_api(request: HttpRequest) -> JsonResponse:
             return JsonResponse({"error": "missing_name_or_path"}, status=400)
         target = os.path.basename(path)
     try:
-        info = _guessit(target)
+        info = guessit(target)
     except Exception as e:  # pragma: no cover
         return JsonResponse({"error": str(e)}, status=500)
 
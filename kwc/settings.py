@@ -204,6 +204,12 @@ EXTRACTION_FOLDER = os.getenv("KWC_EXTRACTION_FOLDER", str(BASE_DIR / "extractio
 # Trash folder for discarded images
 DISCARD_FOLDER = os.getenv("KWC_DISCARD_FOLDER", str(BASE_DIR / "discarded"))
 
+# Persistent cache for generated thumbnails, shared by all workers and kept across restarts.
+# Defaults to the /data volume when present; set KWC_THUMBNAIL_CACHE_FOLDER to an empty value to disable it.
+THUMBNAIL_CACHE_FOLDER = os.getenv(
+    "KWC_THUMBNAIL_CACHE_FOLDER", str(_data_dir / "thumbnails") if _data_dir.is_dir() else ""
+)
+
 
 # Folder pattern (relative to root). Supports Django template syntax and brace placeholders.
 # Example default includes year only when present.
@@ -242,6 +248,9 @@ def _float_setting(env_name: str, default: float, *, minimum: float | None = Non
 EXTRACT_FFMPEG_RETRIES = _int_setting("KWC_EXTRACT_FFMPEG_RETRIES", 2, minimum=0)
 EXTRACT_FFMPEG_RETRY_BACKOFF = _float_setting("KWC_EXTRACT_FFMPEG_RETRY_BACKOFF", 0.5, minimum=0.0)
 
+# Size limit for THUMBNAIL_CACHE_FOLDER; the oldest thumbnails are pruned once it is exceeded
+THUMBNAIL_CACHE_MAX_MB = _int_setting("KWC_THUMBNAIL_CACHE_MAX_MB", 1024, minimum=1)
+
 
 def _positive_int_or_none(value: str | None) -> int | None:
     if value is None:
@@ -0,0 +1 @@
+"""Test package for the kwc project modules."""
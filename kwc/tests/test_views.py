@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from django.test import override_settings
+from django.urls import include, path, reverse
+
+from kwc import views as core_views
+
+
+@pytest.fixture()
+def files_root(tmp_path: Path, settings) -> Path:
+    """Mount serve_file over a temporary root, the way kwc.urls mounts the wallpaper folder."""
+    root = tmp_path / "wallpapers"
+    (root / "Show").mkdir(parents=True)
+    (root / "Show" / "frame01.jpg").write_bytes(b"jpeg")
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+    urlconf = ModuleType("files_urls")
+    urlconf.urlpatterns = [  # type: ignore[attr-defined]
+        path("files/", include([path("<path:path>", core_views.serve_file, {"document_root": root})]))
+    ]
+    settings.ROOT_URLCONF = urlconf
+    return root
+
+
+def test_versioned_file_is_served_immutable(client, files_root: Path) -> None:
+    response = client.get("/files/Show/frame01.jpg", {"v": "abc"})
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"jpeg"
+    assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+
+
+def test_unversioned_file_is_not_marked_immutable(client, files_root: Path) -> None:
+    response = client.get("/files/Show/frame01.jpg")
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"jpeg"
+    assert "immutable" not in response.get("Cache-Control", "")
+
+
+def test_missing_file_returns_404(client, files_root: Path) -> None:
+    assert client.get("/files/Show/missing.jpg", {"v": "abc"}).status_code == 404
+
+
+def test_path_traversal_is_rejected(client, files_root: Path) -> None:
+    response = client.get("/files/../secret.txt", {"v": "abc"})
+
+    assert response.status_code == 400
+    assert b"secret" not in response.content
+
+
+def test_manifest_uses_absolute_urls_for_the_requesting_host(client) -> None:
+    response = client.get(reverse("pwa-manifest"), HTTP_HOST="kwc.example")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/manifest+json"
+    assert response["Cache-Control"] == "no-cache"
+    manifest = json.loads(response.content)
+    assert manifest["id"] == manifest["start_url"] == "http://kwc.example/"
+    assert manifest["scope"] == "http://kwc.example/"
+    assert all(icon["src"].startswith("http://kwc.example/") for icon in manifest["icons"])
+    assert [shortcut["url"] for shortcut in manifest["shortcuts"]] == [
+        "http://kwc.example" + reverse("extract:index"),
+        "http://kwc.example" + reverse("choose:index"),
+    ]
+
+    other = json.loads(client.get(reverse("pwa-manifest"), HTTP_HOST="other.example").content)
+    assert other["start_url"] == "http://other.example/"
+
+
+def test_service_worker_embeds_json_literals(client, settings) -> None:
+    response = client.get(reverse("service-worker"))
+
+    assert response.status_code == 200
+    assert response["Service-Worker-Allowed"] == "/"
+    assert "no-cache" in response["Cache-Control"]
+    body = response.content.decode()
+    cache_name = re.search(r"^const CACHE_NAME = (.+);$", body, re.MULTILINE)
+    precache = re.search(r"^const PRECACHE_URLS = (.+);$", body, re.MULTILINE)
+    assert cache_name is not None
+    assert precache is not None
+    assert json.loads(cache_name.group(1)) == settings.PWA_CACHE_ID
+    assert reverse("offline") in json.loads(precache.group(1))
+    assert json.dumps(reverse("offline")) in body
+
+
+def test_settings_changes_reset_pwa_caches(client) -> None:
+    client.get(reverse("pwa-manifest"))
+    client.get(reverse("service-worker"))
+
+    with override_settings(PWA_APP_NAME="Renamed", PWA_CACHE_ID="kwc-test-cache"):
+        manifest = json.loads(client.get(reverse("pwa-manifest")).content)
+        worker = client.get(reverse("service-worker")).content.decode()
+
+    assert manifest["name"] == "Renamed"
+    assert 'const CACHE_NAME = "kwc-test-cache";' in worker
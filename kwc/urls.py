@@ -15,36 +15,51 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from pathlib import Path
+
 from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path, re_path
+from django.urls import include, path
 from django.views.generic import TemplateView
-from django.views.static import serve as static_serve
 
 from choose import views as choose_views
 from kwc import views as core_views
 
+# PWA endpoints live at the site root, so they share one include() instead of sitting in the main list
+pwa_urls = [
+    path("offline/", TemplateView.as_view(template_name="offline.html"), name="offline"),
+    path("manifest.webmanifest", core_views.ManifestView.as_view(), name="pwa-manifest"),
+    path("service-worker.js", core_views.ServiceWorkerView.as_view(), name="service-worker"),
+]
+
+# Each file-serving route sits behind its literal prefix, so a request is only tested against the
+# patterns of the subtree whose prefix it actually starts with.
 urlpatterns = [
     path("", core_views.HomeView.as_view(), name="home"),
     path("admin/", admin.site.urls),
     path("choose/", include(("choose.urls", "choose"), namespace="choose")),
     path("extract/", include(("extract.urls", "extract"), namespace="extract")),
-    path("wall-thumbs/<str:folder>/<path:filename>", choose_views.thumbnail, name="wallpaper-thumbnail"),
-    path("inbox-thumbs/<str:folder>/<path:filename>", choose_views.inbox_thumbnail, name="inbox-thumbnail"),
-    path("offline/", TemplateView.as_view(template_name="offline.html"), name="offline"),
-    path("manifest.webmanifest", core_views.ManifestView.as_view(), name="pwa-manifest"),
-    path("service-worker.js", core_views.ServiceWorkerView.as_view(), name="service-worker"),
+    path(
+        "wall-thumbs/",
+        include([path("<str:folder>/<path:filename>", choose_views.thumbnail, name="wallpaper-thumbnail")]),
+    ),
+    path(
+        "inbox-thumbs/",
+        include([path("<str:folder>/<path:filename>", choose_views.inbox_thumbnail, name="inbox-thumbnail")]),
+    ),
+    path("", include(pwa_urls)),
 ]
 
 # Serve wallpaper images directly from disk. This is intended for internal/self-hosted use.
-_wall_root = getattr(settings, "WALLPAPERS_FOLDER", None)
-if _wall_root:
+# The roots are resolved once here so the per-request path join starts from a canonical absolute directory.
+if settings.WALLPAPERS_FOLDER:
+    _wall_root = Path(settings.WALLPAPERS_FOLDER).resolve()
     urlpatterns += [
-        re_path(r"^wallpapers/(?P<path>.+)$", static_serve, {"document_root": _wall_root}),
+        path("wallpapers/", include([path("<path:path>", core_views.serve_file, {"document_root": _wall_root})])),
     ]
 
-_inbox_root = getattr(settings, "EXTRACTION_FOLDER", None)
-if _inbox_root:
+if settings.EXTRACTION_FOLDER:
+    _inbox_root = Path(settings.EXTRACTION_FOLDER).resolve()
     urlpatterns += [
-        re_path(r"^inbox-files/(?P<path>.+)$", static_serve, {"document_root": _inbox_root}),
+        path("inbox-files/", include([path("<path:path>", core_views.serve_file, {"document_root": _inbox_root})])),
     ]
@@ -1,9 +1,12 @@
 """Shared utility helpers for the kwc project."""
 
-from .files import cache_token, safe_remove, safe_rename
+from .files import cache_token, file_changed, invalidate_path, safe_remove, safe_remove_many, safe_rename
 
 __all__ = [
     "cache_token",
+    "file_changed",
+    "invalidate_path",
     "safe_remove",
+    "safe_remove_many",
     "safe_rename",
 ]
@@ -1,12 +1,68 @@
 from __future__ import annotations
 
+import base64
 import logging
+import os
+import struct
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from pathlib import Path
 
+from django.dispatch import Signal
+
 logger = logging.getLogger(__name__)
 
-__all__ = ["cache_token", "safe_remove", "safe_rename"]
+__all__ = ["cache_token", "file_changed", "invalidate_path", "safe_remove", "safe_remove_many", "safe_rename"]
+
+# mtime_ns (signed), size, inode packed into 24 bytes; base64 keeps the token URL- and ETag-safe at 32 characters
+_pack_token = struct.Struct("<qQQ").pack
+
+
+def _encode_token(mtime_ns: int, size: int, inode: int) -> str:
+    return base64.urlsafe_b64encode(_pack_token(mtime_ns, size, inode)).decode("ascii")
+
+
+# Sent with ``path`` (a str) whenever what exists at that path was removed or replaced through these helpers, so
+# anything cached per path can drop its entry right away instead of waiting to notice on a later stat.
+file_changed = Signal()
+
+# Paths recently found missing, mapped to when that stops being trusted. Files can also appear without going through
+# these helpers (FFmpeg writing frames, versions copied in by hand), so entries expire on their own as well.
+_MISSING_MAX = 1024
+_MISSING_TTL = 30.0
+_missing: OrderedDict[str, float] = OrderedDict()
+_missing_lock = threading.Lock()
+
+
+def invalidate_path(path: Path | str) -> None:
+    """Notify per-path caches that the file at *path* changed."""
+
+    target = os.fspath(path)
+    with _missing_lock:
+        _missing.pop(target, None)
+    file_changed.send(sender=None, path=target)
+
+
+def _known_missing(path: str) -> bool:
+    with _missing_lock:
+        expires = _missing.get(path)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del _missing[path]
+            return False
+        _missing.move_to_end(path)
+        return True
+
+
+def _remember_missing(path: str) -> None:
+    with _missing_lock:
+        _missing[path] = time.monotonic() + _MISSING_TTL
+        _missing.move_to_end(path)
+        while len(_missing) > _MISSING_MAX:
+            _missing.popitem(last=False)
 
 
 def safe_remove(path: Path) -> None:
@@ -15,61 +71,104 @@ def safe_remove(path: Path) -> None:
     Directories are not removed; missing files are silently ignored after a debug log.
     """
 
-    target = Path(path)
-    if target.is_dir():
-        message = f"safe_remove refuses to delete directories: {target}"
-        logger.error(message)
-        raise IsADirectoryError(message)
+    target = os.fspath(path)
 
+    # unlink(2) already refuses directories (EISDIR on Linux, EPERM on macOS), so there is no stat up front
     try:
-        target.unlink()
+        os.unlink(target)
     except FileNotFoundError:
         logger.debug("safe_remove skipped missing file: %s", target)
+    except (IsADirectoryError, PermissionError) as exc:
+        if isinstance(exc, IsADirectoryError) or os.path.isdir(target):
+            message = f"safe_remove refuses to delete directories: {target}"
+            logger.error(message)
+            raise IsADirectoryError(message) from exc
+        message = f"Unable to remove {target}: {exc}"
+        logger.error(message)
+        raise OSError(message) from exc
     except OSError as exc:  # pragma: no cover - exercised in failure cases
         message = f"Unable to remove {target}: {exc}"
         logger.error(message)
         raise OSError(message) from exc
     else:
         logger.debug("Removed file: %s", target)
+        invalidate_path(target)
 
 
-def safe_rename(src: Path, dest: Path) -> None:
-    """Rename *src* to *dest* with helpful error reporting."""
+def safe_remove_many(paths: Iterable[Path | str]) -> None:
+    """Remove every file in *paths* with :func:`safe_remove`, reporting failures together.
 
-    origin = Path(src)
-    target = Path(dest)
+    Every path is attempted even when an earlier one fails; the failures are then raised as one ``OSError`` whose
+    message names each failing path and its reason, chained from the first failure. If iterating *paths* itself
+    raises (e.g. a cancellation check in a generator), that exception propagates with the failures collected so far
+    logged and attached to it as notes.
+    """
 
-    if not origin.exists():
-        message = f"Source path does not exist: {origin}"
-        logger.error(message)
-        raise FileNotFoundError(message)
+    errors: list[OSError] = []
+    try:
+        for path in paths:
+            try:
+                safe_remove(path)
+            except OSError as exc:
+                errors.append(exc)
+    except BaseException as exc:
+        if errors:
+            logger.error("Stopped removing files after %d failure(s): %s", len(errors), exc)
+            for error in errors:
+                exc.add_note(str(error))
+        raise
+    if errors:
+        details = "; ".join(str(exc) for exc in errors)
+        raise OSError(f"Unable to remove {len(errors)} file(s): {details}") from errors[0]
 
-    if not target.parent.exists():
-        message = f"Destination directory does not exist: {target.parent}"
-        logger.error(message)
-        raise FileNotFoundError(message)
+
+def safe_rename(src: Path, dest: Path) -> None:
+    """Rename *src* to *dest* with helpful error reporting."""
+
+    origin = os.fspath(src)
+    target = os.fspath(dest)
 
     try:
-        origin.replace(target)
+        os.replace(origin, target)
+    except FileNotFoundError as exc:
+        # rename(2) reports a missing source and a missing destination directory alike; only pay the extra stats
+        # to tell them apart once it has already failed
+        if not os.path.exists(origin):
+            message = f"Source path does not exist: {origin}"
+        elif not os.path.exists(parent := os.path.dirname(target) or "."):
+            message = f"Destination directory does not exist: {parent}"
+        else:
+            message = f"Unable to rename {origin} -> {target}: {exc}"
+        logger.error(message)
+        raise FileNotFoundError(message) from exc
     except OSError as exc:  # pragma: no cover - exercised in failure cases
         message = f"Unable to rename {origin} -> {target}: {exc}"
         logger.error(message)
         raise OSError(message) from exc
     else:
         logger.debug("Renamed %s -> %s", origin, target)
+        invalidate_path(origin)
+        invalidate_path(target)
 
 
-def cache_token(path: Path) -> str:
-    """Return a stable cache token derived from file metadata."""
+def cache_token(path: Path, stat: os.stat_result | None = None) -> str:
+    """Return a stable cache token derived from file metadata.
 
-    target = Path(path)
-    try:
-        stat = target.stat()
-    except OSError as exc:
-        logger.debug("Falling back to timestamp cache token for %s: %s", target, exc)
-        return f"{int(time.time() * 1_000_000):x}"
+    Pass *stat* when the caller already holds the file's stat result (e.g. from ``os.scandir``)
+    to avoid a second ``stat`` call.
+    """
 
-    inode = getattr(stat, "st_ino", 0)
-    token = f"{stat.st_mtime_ns:x}-{stat.st_size:x}-{inode:x}"
+    target = os.fspath(path)
+    if stat is None:
+        if _known_missing(target):
+            return _encode_token(time.time_ns(), 0, 0)
+        try:
+            stat = os.stat(target)
+        except OSError as exc:
+            logger.debug("Falling back to timestamp cache token for %s: %s", target, exc)
+            _remember_missing(target)
+            return _encode_token(time.time_ns(), 0, 0)
+
+    token = _encode_token(stat.st_mtime_ns, stat.st_size, getattr(stat, "st_ino", 0))
     logger.debug("cache_token generated for %s: %s", target, token)
     return token
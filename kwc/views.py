@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
 from django.templatetags.static import static
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
-from django.views.generic import TemplateView
+from django.views.generic import TemplateView, View
+from django.views.static import serve as static_serve
 
 from choose.utils import list_media_folders
 
+# Image URLs carry a ?v= cache token that changes whenever the file does, so a versioned response never goes stale
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def serve_file(request: HttpRequest, path: str, document_root: Path) -> HttpResponse:
+    """Serve a wallpaper or inbox file straight from disk.
+
+    ``static_serve`` already streams through ``FileResponse``, so the WSGI server's file wrapper (``sendfile`` under
+    Gunicorn) does the copying; versioned URLs are additionally marked immutable so browsers stop revalidating them.
+    """
+    response = static_serve(request, path, document_root=document_root)
+    if "v" in request.GET:
+        response["Cache-Control"] = _IMMUTABLE_CACHE_CONTROL
+    return response
+
 
 class HomeView(TemplateView):
     template_name = "home.html"
@@ -36,96 +60,113 @@ class HomeView(TemplateView):
         return context
 
 
-class ManifestView(TemplateView):
+# The manifest's fixed entries; only their URLs are resolved, and that once per request origin
+_MANIFEST_ICONS = (
+    {"src": "kwc/icon.png", "sizes": "192x192", "type": "image/png", "purpose": "any maskable"},
+    {"src": "kwc/icon.png", "sizes": "512x512", "type": "image/png", "purpose": "any maskable"},
+)
+_MANIFEST_SHORTCUTS = (
+    {
+        "name": "Extract frames",
+        "short_name": "Extract",
+        "description": "Start a new extraction job",
+        "url": "extract:index",
+    },
+    {
+        "name": "Choose wallpapers",
+        "short_name": "Choose",
+        "description": "Review and keep your favorite frames",
+        "url": "choose:index",
+    },
+)
+_MANIFEST_ORIGINS_MAX = 8
+_manifest_by_origin: dict[str, bytes] = {}
+
+
+def _clear_pwa_caches(**kwargs: Any) -> None:
+    # Only tests change settings at runtime; drop the per-process PWA snapshots when they do
+    _manifest_by_origin.clear()
+    _service_worker_body.cache_clear()
+
+
+def _manifest_body(request: HttpRequest) -> bytes:
+    """Return the encoded manifest for the origin *request* was made to.
+
+    ``reverse()`` and hashed ``static()`` lookups only change with a deploy and absolute URLs only with the host, so
+    the finished JSON is kept per origin (in practice one or two).
+    """
+    origin = f"{request.scheme}://{request.get_host()}"
+    body = _manifest_by_origin.get(origin)
+    if body is not None:
+        return body
+
+    build_absolute = request.build_absolute_uri
+    start_url = build_absolute(settings.PWA_START_URL)
+    manifest = {
+        "name": settings.PWA_APP_NAME,
+        "short_name": settings.PWA_APP_SHORT_NAME,
+        "description": settings.PWA_APP_DESCRIPTION,
+        "id": start_url,
+        "start_url": start_url,
+        "scope": build_absolute(settings.PWA_SCOPE),
+        "display": settings.PWA_DISPLAY,
+        "orientation": settings.PWA_ORIENTATION,
+        "theme_color": settings.PWA_THEME_COLOR,
+        "background_color": settings.PWA_BACKGROUND_COLOR,
+        "lang": settings.LANGUAGE_CODE,
+        "icons": [{**icon, "src": build_absolute(static(icon["src"]))} for icon in _MANIFEST_ICONS],
+        "shortcuts": [
+            {**shortcut, "url": build_absolute(reverse(shortcut["url"]))} for shortcut in _MANIFEST_SHORTCUTS
+        ],
+    }
+    body = json.dumps(manifest, separators=(",", ":")).encode()
+    if len(_manifest_by_origin) >= _MANIFEST_ORIGINS_MAX:
+        _manifest_by_origin.clear()
+    _manifest_by_origin[origin] = body
+    return body
+
+
+@lru_cache(maxsize=1)
+def _service_worker_body() -> bytes:
+    """Return the rendered service worker.
+
+    Its inputs (cache id, reversed URLs, hashed static names) are fixed for the life of the process, so the template
+    is rendered once and every later fetch, including the browser's update polls, is served from these bytes.
+    """
+    asset_urls = [
+        reverse("home"),
+        reverse("offline"),
+        reverse("extract:index"),
+        reverse("choose:index"),
+        static("kwc/icon.png"),
+        static("kwc/favicon.ico"),
+    ]
+    # Every value is dropped in as a JSON literal, which is also valid (and correctly escaped) JavaScript
+    context = {
+        "cache_name": json.dumps(settings.PWA_CACHE_ID),
+        "asset_urls": json.dumps(asset_urls, separators=(",", ":")),
+        "offline_url": json.dumps(reverse("offline")),
+    }
+    return render_to_string("pwa/service-worker.js", context).encode()
+
+
+setting_changed.connect(_clear_pwa_caches)
+
+
+class ManifestView(View):
     """Serve a dynamic web manifest so hashed static URLs stay accurate."""
 
-    template_name = "pwa/manifest.webmanifest"
-    content_type = "application/manifest+json"
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        request = self.request
-        build_absolute = request.build_absolute_uri
-
-        context.update(
-            {
-                "name": settings.PWA_APP_NAME,
-                "short_name": settings.PWA_APP_SHORT_NAME,
-                "description": settings.PWA_APP_DESCRIPTION,
-                "start_url": build_absolute(settings.PWA_START_URL),
-                "scope": build_absolute(settings.PWA_SCOPE),
-                "display": settings.PWA_DISPLAY,
-                "orientation": settings.PWA_ORIENTATION,
-                "theme_color": settings.PWA_THEME_COLOR,
-                "background_color": settings.PWA_BACKGROUND_COLOR,
-                "lang": settings.LANGUAGE_CODE,
-                "icon_sources": [
-                    {
-                        "src": build_absolute(static("kwc/icon.png")),
-                        "sizes": "192x192",
-                        "type": "image/png",
-                        "purpose": "any maskable",
-                    },
-                    {
-                        "src": build_absolute(static("kwc/icon.png")),
-                        "sizes": "512x512",
-                        "type": "image/png",
-                        "purpose": "any maskable",
-                    },
-                ],
-                "shortcuts": [
-                    {
-                        "name": "Extract frames",
-                        "short_name": "Extract",
-                        "description": "Start a new extraction job",
-                        "url": build_absolute(reverse("extract:index")),
-                    },
-                    {
-                        "name": "Choose wallpapers",
-                        "short_name": "Choose",
-                        "description": "Review and keep your favorite frames",
-                        "url": build_absolute(reverse("choose:index")),
-                    },
-                ],
-            }
-        )
-        return context
-
-    def render_to_response(self, context, **response_kwargs):
-        response = super().render_to_response(context, **response_kwargs)
+    def get(self, request, *args, **kwargs):
+        response = HttpResponse(_manifest_body(request), content_type="application/manifest+json")
         response["Cache-Control"] = "no-cache"
         return response
 
 
 @method_decorator(never_cache, name="dispatch")
-class ServiceWorkerView(TemplateView):
+class ServiceWorkerView(View):
     """Serve the service worker at the root scope."""
 
-    template_name = "pwa/service-worker.js"
-    content_type = "application/javascript"
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        asset_urls = [
-            reverse("home"),
-            reverse("offline"),
-            reverse("extract:index"),
-            reverse("choose:index"),
-            static("kwc/icon.png"),
-            static("kwc/favicon.ico"),
-        ]
-
-        context.update(
-            {
-                "cache_name": settings.PWA_CACHE_ID,
-                "asset_urls": asset_urls,
-                "offline_url": reverse("offline"),
-            }
-        )
-        return context
-
-    def render_to_response(self, context, **response_kwargs):
-        response = super().render_to_response(context, **response_kwargs)
+    def get(self, request, *args, **kwargs):
+        response = HttpResponse(_service_worker_body(), content_type="application/javascript")
         response["Service-Worker-Allowed"] = "/"
         return response
@@ -1,8 +1,5 @@
-const CACHE_NAME = '{{ cache_name }}';
-const PRECACHE_URLS = [
-{% for url in asset_urls %}  '{{ url }}'{% if not forloop.last %},{% endif %}
-{% endfor %}
-];
+const CACHE_NAME = {{ cache_name|safe }};
+const PRECACHE_URLS = {{ asset_urls|safe }};
 
 self.addEventListener('install', (event) => {
   event.waitUntil(
@@ -44,7 +41,7 @@ self.addEventListener('fetch', (event) => {
           return response;
         })
         .catch(() =>
-          caches.match(request).then((cached) => cached || caches.match('{{ offline_url }}'))
+          caches.match(request).then((cached) => cached || caches.match({{ offline_url|safe }}))
         )
     );
     return;